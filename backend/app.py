@@ -1,20 +1,56 @@
+import asyncio
+from contextlib import asynccontextmanager
 from typing import List, Optional
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+from fastapi import Depends, FastAPI, UploadFile, File, Form, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel, EmailStr
-from db import auth_collection
+import db
+from db import get_auth_collection
 from pypdf import PdfReader
 from dotenv import load_dotenv
-from job_seekers import analyze_skill_gap
-from resume_screening import Invisible_extract_text_with_highlight, analyze_resume_with_ai, fetch_required_skills_from_role
+from job_seekers import SKILL_GAP_PROMPT_VERSION, analyze_skill_gap
+from resume_screening import fetch_required_skills_from_role
+from services import analysis_store
+from services.batch_screening import screen_resumes, shutdown_pdf_executor
+from services.candidate_pool import drain_pool_indexing
+from services.document_cache import fingerprint
+from services.embedding_batcher import stop_embedding_batcher
+from services.llm_gateway import LLMError, close_clients
+from services.mail_queue import start_mail_queue, stop_mail_queue
+from services.model_registry import get_model_status, warm_up, warmup_names
+from services.near_duplicate import canonical_jd
+from services.quota import (
+    QuotaReservation,
+    invalidate_user_status,
+    require_b2b_licence,
+    require_quota,
+)
 import http.client
 
-from routes import phase1,phase2,phase3,phase4,phase5,phase6
+from routes import candidates,history,metrics,phase1,phase2,phase3,phase4,phase5,phase6
 
 
 load_dotenv()
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await db.connect()
+    start_mail_queue()
+    # Load WARMUP_MODELS off the event loop; /ready answers 503 until they are in
+    app.state.model_warmup = asyncio.create_task(asyncio.to_thread(warm_up, warmup_names()))
+    yield
+    # Flush queued mail and pending candidate-pool updates before the process exits
+    await asyncio.to_thread(stop_mail_queue)
+    await drain_pool_indexing()
+    await asyncio.to_thread(stop_embedding_batcher)
+    shutdown_pdf_executor()
+    await close_clients()
+    await db.close()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -30,12 +66,20 @@ app.add_middleware(
 )
 
 
+@app.exception_handler(LLMError)
+async def llm_error_handler(request: Request, exc: LLMError):
+    return JSONResponse(status_code=502, content={"detail": f"AI service error: {exc}"})
+
+
 app.include_router(phase1.router, prefix="/phase1")
 app.include_router(phase2.router, prefix="/phase2")
 app.include_router(phase3.router, prefix="/phase3")
 app.include_router(phase4.router, prefix="/phase4")
 app.include_router(phase5.router, prefix="/interview")
 app.include_router(phase6.router, prefix="/payment")
+app.include_router(metrics.router, prefix="/metrics")
+app.include_router(candidates.router, prefix="/candidates")
+app.include_router(history.router, prefix="/history")
 
 def extract_text_from_pdf(file_obj) -> str:
     """Extract text from a PDF file-like object. Raises HTTPException on failure."""
@@ -63,27 +107,10 @@ async def analyze_resume(email:str,
     resume: UploadFile = File(...),
     job_description: Optional[str] = Form(None),
     job_role: Optional[str] = Form(None),
+    bypass_cache: bool = False,
+    quota: QuotaReservation = Depends(require_quota),
 ):
 
-    user = auth_collection.find_one({"email": email})
-    
-    if not user:
-        # If user doesn't exist, create them with 0 count
-        auth_collection.update_one(
-            {"email": email},
-            {"$setOnInsert": {"email": email, "freemium_count": 0, "ispremium": False}},
-            upsert=True
-        )
-        user = {"freemium_count": 0, "ispremium": False}
-
-    # 2. Check if limit reached
-    # Limit is set to 3 for free users
-    if not user.get("ispremium", False) and user.get("freemium_count", 0) >= 99:
-        raise HTTPException(
-            status_code=403, 
-            detail="Free limit reached (3/3). Please upgrade to Premium for unlimited access."
-        )
-
     # Validate at least JD or role provided
     if not job_description and not job_role:
         raise HTTPException(status_code=400, detail="Provide either job_description or job_role")
@@ -92,78 +119,78 @@ async def analyze_resume(email:str,
     if resume.content_type and "pdf" not in resume.content_type.lower():
         raise HTTPException(status_code=400, detail="Only PDF resumes are supported")
 
-    resume_text = extract_text_from_pdf(resume.file)
-
-    result = analyze_skill_gap(resume_text, job_description=job_description, job_role=job_role)
-    auth_collection.update_one(
-        {"email": email},
-        {"$inc": {"freemium_count": 1}}
+    # The same resume against the same (or a near-duplicate of one of this
+    # user's earlier) JD/role was analysed before: reuse it. The canonical JD
+    # only builds the key; history and the LLM get the submitted JD.
+    target = {"job_description": job_description, "job_role": job_role}
+    key_target = {"job_description": canonical_jd(job_description, email), "job_role": job_role}
+    key = analysis_store.analysis_key(
+        "skill_gap", fingerprint(await resume.read()), key_target, SKILL_GAP_PROMPT_VERSION
     )
+    if not bypass_cache:
+        stored = await analysis_store.find(key)
+        if stored is not None:
+            await analysis_store.record(email, key, "skill_gap", resume.filename, target, stored)
+            # No new analysis was run, so it does not use up a freemium unit
+            await quota.refund()
+            return {"analysis": stored, "cached": True}
+
+    # pypdf parsing is CPU-bound; keep it off the event loop
+    resume_text = await asyncio.to_thread(extract_text_from_pdf, resume.file)
+
+    result = await analyze_skill_gap(resume_text, job_description=job_description, job_role=job_role)
+    if "raw_response" not in result:
+        await analysis_store.record(email, key, "skill_gap", resume.filename, target, result)
     return {"analysis": result}
 
 @app.post("/analyze-resumes")
 async def resumes_screening(email:str,
     resumes: List[UploadFile] = File(...),
     job_description: Optional[str] = Form(None),
-    job_role: Optional[str] = Form(None)
+    job_role: Optional[str] = Form(None),
+    prefilter_top_k: Optional[int] = Form(None),
+    prefilter_min_score: Optional[float] = Form(None),
+    bypass_cache: bool = False,
+    _licensed: str = Depends(require_b2b_licence),
 ):
 
-    user = auth_collection.find_one({"email": email})
-    
-    if not user:
-        # If user doesn't exist, create them with 0 count
-        auth_collection.update_one(
-            {"email": email},
-            {"$setOnInsert": {"email": email, "freemium_count": 0, "ispremium": False}},
-            upsert=True
-        )
-        user = {"freemium_count": 0, "ispremium": False}
-
-    # 2. Check if limit reached
-    # Limit is set to 3 for free users
-    if user.get("b2blicence", "no") == "no":
-        raise HTTPException(
-            status_code=403, 
-            detail="Please buy the B2B Licence for Accessing this feature."
-        )
-
     if not job_description and not job_role:
         raise HTTPException(
             status_code=400,
             detail="Provide either job_description or job_role"
         )
 
+    if prefilter_top_k is not None and prefilter_top_k < 1:
+        raise HTTPException(status_code=400, detail="prefilter_top_k must be at least 1")
+
     # If role given → fetch required skills using AI
     if job_role:
-        required_skills = fetch_required_skills_from_role(job_role)
+        required_skills = await fetch_required_skills_from_role(job_role)
         job_text = f"Job Role: {job_role}\nRequired Skills: {', '.join(required_skills)}"
     else:
         job_text = job_description
-
-    results = []
-
-    
-
-    for resume in resumes:
-        resume.file.seek(0)
-        resume_text = extract_text_from_pdf(resume.file)
-        # print(resume_text)
-        # print()
-
-        resume.file.seek(0)
-        invisible_text_list = Invisible_extract_text_with_highlight(resume.file)
-
-        if invisible_text_list:
-            for hidden_text in invisible_text_list:
-                if hidden_text.strip():
-                    resume_text = resume_text.replace(hidden_text.strip(), "")
-        # print(resume_text)
-        analysis = analyze_resume_with_ai(resume_text, job_text)
-
-        results.append({
-            "resume_name": resume.filename,
-            "analysis": analysis
-        })
+    # Analyses are stored under the role itself (the generated skills list
+    # varies between calls and workers) or the canonical near-duplicate JD;
+    # the LLM gets job_text
+    if job_role:
+        job_key = f"Job Role: {' '.join(job_role.lower().split())}"
+    else:
+        job_key = canonical_jd(job_description, email)
+
+    uploads = [(resume.filename, await resume.read()) for resume in resumes]
+
+    # Optional local pre-filter: only the best-scoring resumes go to the LLM.
+    # Parsed resumes also join the caller's candidate pool for /candidates search,
+    # in the background once the results are back.
+    results = await screen_resumes(
+        uploads,
+        job_text,
+        prefilter_top_k=prefilter_top_k,
+        prefilter_min_score=prefilter_min_score,
+        tenant=email,
+        bypass_cache=bypass_cache,
+        job_key=job_key,
+    )
 
     return results
 
@@ -184,9 +211,10 @@ class PremiumRequest(EmailRequest):
 # ----- APIs -----
 
 @app.post("/register-email")
-def register_email(user: UserEmail):
+async def register_email(user: UserEmail):
+    auth_collection = get_auth_collection()
 
-    result = auth_collection.update_one(
+    result = await auth_collection.update_one(
         {"email": user.email},
         {
             "$setOnInsert": {
@@ -207,8 +235,9 @@ def register_email(user: UserEmail):
 
 # 1️⃣ Add or update B2B licence
 @app.post("/add-b2blicence")
-def add_b2blicence(req: B2BLicenceRequest):
-    result = auth_collection.update_one(
+async def add_b2blicence(req: B2BLicenceRequest):
+    auth_collection = get_auth_collection()
+    result = await auth_collection.update_one(
         {"email": req.email},
         {"$set": {"b2blicence": req.b2blicence}},
         upsert=False  # Only update existing user
@@ -217,13 +246,16 @@ def add_b2blicence(req: B2BLicenceRequest):
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="User not found")
 
+    invalidate_user_status(req.email)
+
     return {"message": f"B2B licence updated to '{req.b2blicence}' for {req.email}"}
 
 
 # 2️⃣ Update ispremium
 @app.post("/update-ispremium")
-def update_ispremium(req: PremiumRequest):
-    result = auth_collection.update_one(
+async def update_ispremium(req: PremiumRequest):
+    auth_collection = get_auth_collection()
+    result = await auth_collection.update_one(
         {"email": req.email},
         {"$set": {"ispremium": req.ispremium}},
         upsert=False
@@ -232,13 +264,16 @@ def update_ispremium(req: PremiumRequest):
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="User not found")
 
+    invalidate_user_status(req.email)
+
     return {"message": f"ispremium updated to {req.ispremium} for {req.email}"}
 
 
 # 3️⃣ Increment freemium_count
 @app.post("/increment-freemium")
-def increment_freemium(req: EmailRequest):
-    result = auth_collection.update_one(
+async def increment_freemium(req: EmailRequest):
+    auth_collection = get_auth_collection()
+    result = await auth_collection.update_one(
         {"email": req.email},
         {"$inc": {"freemium_count": 1}},
         upsert=False
@@ -251,8 +286,9 @@ def increment_freemium(req: EmailRequest):
 
 
 @app.post("/updateb2b")
-def b2b_licence(email: str, b2blicence: str):
-    result = auth_collection.update_one(
+async def b2b_licence(email: str, b2blicence: str):
+    auth_collection = get_auth_collection()
+    result = await auth_collection.update_one(
         {"email": email},
         {"$set": {"b2blicence": b2blicence}},
         upsert=False  # Only update existing user
@@ -261,8 +297,18 @@ def b2b_licence(email: str, b2blicence: str):
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="User not found")
 
+    invalidate_user_status(email)
+
     return {"message": f"B2B licence updated to '{b2blicence}' for {email}"}
     
+@app.get("/ready")
+def readiness():
+    status = get_model_status()
+    status["mongo"] = db.db is not None
+    status["ready"] = status["ready"] and status["mongo"]
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+
 @app.get('/')
 def Welcome():
     return {"Greeting": "Welcome"}
@@ -0,0 +1,126 @@
+"""
+Benchmark the auth collection queries with and without the declared indexes.
+
+Seeds a throwaway database on a local Mongo with synthetic users, then times
+the three hot queries (status lookup by email, the quota reservation
+find_one_and_update and the register upsert) first as collection scans and
+then after db.ensure_indexes() has built the index set.
+
+Usage (from backend/, against a disposable mongod):
+    python benchmarks/bench_auth_indexes.py [--users 1000000] [--queries 2000]
+        [--uri mongodb://localhost:27017] [--db bench_auth_indexes]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from pymongo import AsyncMongoClient, InsertOne, ReturnDocument
+
+import db as db_module
+from services.quota import FREEMIUM_LIMIT, STATUS_PROJECTION
+
+SEED_BATCH = 10_000
+
+
+def synthetic_email(i):
+    return f"user{i:07d}@example.com"
+
+
+async def seed(collection, users):
+    started = time.perf_counter()
+    for start in range(0, users, SEED_BATCH):
+        batch = [
+            InsertOne({
+                "email": synthetic_email(i),
+                "freemium_count": i % FREEMIUM_LIMIT,
+                "ispremium": i % 20 == 0,
+                "b2blicence": "yes" if i % 50 == 0 else "no",
+            })
+            for i in range(start, min(start + SEED_BATCH, users))
+        ]
+        await collection.bulk_write(batch, ordered=False)
+    return time.perf_counter() - started
+
+
+async def time_queries(collection, users, queries):
+    emails = [synthetic_email(random.randrange(users)) for _ in range(queries)]
+    timings = {"find_one": [], "reserve": [], "register": []}
+
+    for email in emails:
+        started = time.perf_counter()
+        await collection.find_one({"email": email}, STATUS_PROJECTION)
+        timings["find_one"].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await collection.find_one_and_update(
+            {"email": email, "ispremium": {"$ne": True}, "freemium_count": {"$lt": FREEMIUM_LIMIT}},
+            {"$inc": {"freemium_count": 0}},
+            projection=STATUS_PROJECTION,
+            return_document=ReturnDocument.BEFORE,
+        )
+        timings["reserve"].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await collection.update_one({"email": email}, {"$setOnInsert": {"email": email}}, upsert=True)
+        timings["register"].append(time.perf_counter() - started)
+
+    plan = await collection.find({"email": emails[0]}).explain()
+    stats = plan.get("executionStats", {})
+    return timings, stats.get("totalDocsExamined")
+
+
+def summarize(label, timings, docs_examined):
+    print(f"\n{label} (docs examined per lookup: {docs_examined})")
+    for name, samples in timings.items():
+        samples_ms = sorted(s * 1000 for s in samples)
+        p99 = samples_ms[min(len(samples_ms) - 1, int(len(samples_ms) * 0.99))]
+        print(f"  {name:<9} median {statistics.median(samples_ms):8.3f} ms   p99 {p99:8.3f} ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--scan-queries", type=int, default=50, help="queries to time before indexing")
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="bench_auth_indexes")
+    args = parser.parse_args()
+
+    client = AsyncMongoClient(args.uri)
+    try:
+        await client.drop_database(args.db)
+        database = client[args.db]
+        collection = database["auth"]
+
+        seconds = await seed(collection, args.users)
+        print(f"Seeded {args.users:,} users in {seconds:.1f}s")
+
+        # Collection scans are slow at this size, so fewer queries are timed
+        timings, examined = await time_queries(collection, args.users, args.scan_queries)
+        summarize("Without indexes", timings, examined)
+
+        started = time.perf_counter()
+        await db_module.ensure_indexes(database)
+        print(f"\nBuilt index set in {time.perf_counter() - started:.1f}s")
+
+        timings, examined = await time_queries(collection, args.users, args.queries)
+        summarize("With indexes", timings, examined)
+
+        # A second run must be a no-op
+        started = time.perf_counter()
+        await db_module.ensure_indexes(database)
+        print(f"\nensure_indexes() on an indexed database: {(time.perf_counter() - started) * 1000:.1f} ms")
+    finally:
+        await client.drop_database(args.db)
+        await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,115 @@
+"""
+Benchmark the BM25 candidate index at 10k and 100k synthetic resumes.
+
+For each pool size it reports:
+  build     incremental add() of every resume, appending to the log
+  replay    loading the index back from its log (a restart)
+  query     rank() latency against JD-sized queries, p50 and p95
+  rank_bm25 BM25Okapi build and get_scores time on the same corpus, and the
+            largest score difference from the index (should be ~1e-12)
+
+Resumes are drawn from a Zipf-weighted vocabulary, with skill terms mixed in,
+so term frequencies look like real text.
+
+Usage (from backend/):
+    python benchmarks/bench_bm25_index.py [--sizes 10000 100000] [--queries 50] [--no-reference]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import numpy as np
+
+from services.bm25_index import BM25Index, tokenize
+
+SKILLS = [
+    "python", "fastapi", "django", "flask", "postgresql", "mongodb", "redis", "docker", "kubernetes",
+    "aws", "gcp", "azure", "terraform", "kafka", "react", "typescript", "java", "spring", "go", "c++",
+]
+
+
+def build_corpus(size, seed=0, vocab_size=30000):
+    rng = random.Random(seed)
+    vocab = [f"term{i}" for i in range(vocab_size)]
+    weights = [1 / (rank + 1) for rank in range(vocab_size)]
+    docs = []
+    for _ in range(size):
+        words = rng.choices(vocab, weights=weights, k=rng.randint(150, 450))
+        words += rng.sample(SKILLS, rng.randint(2, 8))
+        docs.append(" ".join(words))
+    return docs, vocab, weights
+
+
+def build_queries(count, vocab, weights, seed=1):
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choices(vocab, weights=weights, k=60) + rng.sample(SKILLS, 6))
+        for _ in range(count)
+    ]
+
+
+def percentile(samples, pct):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--no-reference", action="store_true", help="skip the rank_bm25 comparison")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        docs, vocab, weights = build_corpus(size)
+        queries = build_queries(args.queries, vocab, weights)
+        print(f"\n{size:,} resumes")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            log_path = os.path.join(tmp, "pool.jsonl")
+
+            started = time.perf_counter()
+            index = BM25Index(log_path)
+            for i, doc in enumerate(docs):
+                index.add(f"resume{i}", doc, name=f"resume{i}.pdf")
+            print(f"  build      {time.perf_counter() - started:8.2f} s   {index.stats()}")
+            print(f"  log size   {os.path.getsize(log_path) / 2**20:8.1f} MB")
+
+            started = time.perf_counter()
+            index = BM25Index(log_path)
+            print(f"  replay     {time.perf_counter() - started:8.2f} s")
+
+            timings = []
+            for query in queries:
+                started = time.perf_counter()
+                index.rank(query, top_k=50)
+                timings.append((time.perf_counter() - started) * 1000)
+            print(f"  query      p50 {statistics.median(timings):7.2f} ms   p95 {percentile(timings, 0.95):7.2f} ms")
+
+            if args.no_reference:
+                continue
+
+            from rank_bm25 import BM25Okapi
+
+            started = time.perf_counter()
+            reference = BM25Okapi([tokenize(doc) for doc in docs])
+            print(f"  rank_bm25  build {time.perf_counter() - started:7.2f} s")
+
+            timings, drift = [], 0.0
+            for query in queries[:5]:
+                started = time.perf_counter()
+                expected = reference.get_scores(tokenize(query))
+                timings.append((time.perf_counter() - started) * 1000)
+                drift = max(drift, float(np.abs(expected - index.get_scores(query)).max()))
+            print(f"  rank_bm25  query p50 {statistics.median(timings):7.2f} ms   max score diff {drift:.2e}")
+
+
+if __name__ == "__main__":
+    main()
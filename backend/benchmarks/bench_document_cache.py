@@ -0,0 +1,105 @@
+"""
+Benchmark the document cache on repeat resume uploads.
+
+Reports, per synthetic resume size:
+  parse     analyze_document on every upload (no cache), per resume
+  memory    a repeat upload answered from the in-process LRU
+  disk      a repeat upload answered from DOCUMENT_CACHE_DIR after a restart
+
+then replays an upload stream where --repeat-share of the uploads are
+resumes seen before, through analyze_document_in_pool, and prints the
+cache's hit rate and the parse time it saved.
+
+Usage (from backend/):
+    python benchmarks/bench_document_cache.py [--pages 1 2 4] [--uploads 200] [--repeat-share 0.4]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from bench_hidden_text import build_sample_resume
+
+
+def median_ms(fn, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def upload_stream(uploads, repeat_share, seed=0):
+    """Resume PDFs in upload order; repeats are byte-identical to an earlier upload."""
+    rng = random.Random(seed)
+    seen = []
+    for i in range(uploads):
+        if seen and rng.random() < repeat_share:
+            yield rng.choice(seen)
+        else:
+            # A unique marker keeps each new resume's bytes (and fingerprint) distinct
+            pdf_bytes = build_sample_resume(pages=1 + i % 2, lines_per_page=40) + f"%{i}\n".encode()
+            seen.append(pdf_bytes)
+            yield pdf_bytes
+
+
+async def replay(stream):
+    from services.batch_screening import analyze_document_in_pool, shutdown_pdf_executor
+
+    started = time.perf_counter()
+    for pdf_bytes in stream:
+        await analyze_document_in_pool(pdf_bytes)
+    shutdown_pdf_executor()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--uploads", type=int, default=200)
+    parser.add_argument("--repeat-share", type=float, default=0.4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # The module reads its settings at import time
+        os.environ["DOCUMENT_CACHE_DIR"] = tmp
+        from services import document_cache
+        from services.document_analysis import analyze_document
+
+        print(f"{'pages':>5}{'parse ms':>11}{'memory ms':>11}{'disk ms':>10}")
+        for pages in args.pages:
+            pdf_bytes = build_sample_resume(pages=pages)
+            key = document_cache.fingerprint(pdf_bytes)
+
+            parse = median_ms(lambda: analyze_document(pdf_bytes), args.runs)
+            document_cache.analyze_document_cached(pdf_bytes)
+            memory = median_ms(lambda: document_cache.analyze_document_cached(pdf_bytes), args.runs)
+
+            def from_disk():
+                document_cache._memory.pop(key)  # as after a restart
+                document_cache.analyze_document_cached(pdf_bytes)
+
+            disk = median_ms(from_disk, args.runs)
+            print(f"{pages:>5}{parse:>11.2f}{memory:>11.3f}{disk:>10.3f}")
+
+        document_cache._memory.clear()
+        document_cache._counters.clear()
+        stream = list(upload_stream(args.uploads, args.repeat_share))
+        elapsed = asyncio.run(replay(stream))
+        print(f"\n{args.uploads} uploads, {args.repeat_share:.0%} repeats: {elapsed:.2f} s")
+        for name, value in document_cache.get_stats().items():
+            if name != "memory":
+                print(f"  {name:<22} {value}")
+
+
+if __name__ == "__main__":
+    main()
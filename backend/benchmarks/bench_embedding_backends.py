@@ -0,0 +1,135 @@
+"""
+Parity and speed of the embedding backends (EMBEDDING_BACKEND).
+
+Parity: every ONNX backend must embed each text within --min-cosine of the
+PyTorch embedding, and its text-vs-JD similarity scores (0-100, as used by
+calculate_semantic_similarities) must stay within --max-score-diff points.
+The script exits with status 1 if a backend fails, so it can gate a
+deployment that switches backends.
+
+Speed: texts per second at several batch sizes, and p50/p95 latency of the
+two-text encode calls the scoring path makes per request.
+
+Usage (from backend/, after scripts/export_onnx.py):
+    python benchmarks/bench_embedding_backends.py [--backends torch onnx onnx-int8] [--runs 20]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import numpy as np
+
+from services.model_registry import EMBEDDING_ONNX_DIR, SENTENCE_MODEL_NAME
+from services.onnx_encoder import ONNX_MODEL_FILES, OnnxSentenceEncoder
+
+# fp32 export should match torch almost exactly; int8 trades a little accuracy for speed
+DEFAULT_MIN_COSINE = {"onnx": 0.999, "onnx-int8": 0.98}
+
+JOB_DESCRIPTION = (
+    "Backend developer with Python, FastAPI and Django experience. Design REST APIs and "
+    "microservices, work with PostgreSQL and MongoDB, deploy with Docker and Kubernetes on AWS."
+)
+
+PHRASES = [
+    "Built REST APIs in Python and FastAPI serving 2M requests a day",
+    "Led migration of a monolith to Kubernetes microservices on AWS",
+    "Designed PostgreSQL schemas and tuned slow queries",
+    "Mentored four junior engineers and ran code reviews",
+    "Managed social media campaigns and brand partnerships",
+    "Registered nurse with ICU and emergency department experience",
+    "Implemented CI/CD pipelines with GitHub Actions and Docker",
+    "Data analysis in pandas, dashboards in Tableau",
+]
+
+
+def corpus(size, seed=0):
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(size):
+        texts.append(". ".join(rng.sample(PHRASES, rng.randint(1, len(PHRASES)))))
+    return texts + ["", "python", JOB_DESCRIPTION]
+
+
+def load_backend(name, threads):
+    if name == "torch":
+        from sentence_transformers import SentenceTransformer
+
+        return SentenceTransformer(SENTENCE_MODEL_NAME, device="cpu")
+    return OnnxSentenceEncoder(EMBEDDING_ONNX_DIR, ONNX_MODEL_FILES[name], threads=threads)
+
+
+def unit(rows):
+    rows = np.asarray(rows, dtype=np.float32)
+    return rows / np.clip(np.linalg.norm(rows, axis=1, keepdims=True), 1e-12, None)
+
+
+def check_parity(reference, candidate, texts, min_cosine, max_score_diff):
+    ref = unit(reference.encode(texts))
+    cand = unit(candidate.encode(texts))
+    cosines = (ref * cand).sum(axis=1)
+
+    jd_ref = unit(reference.encode([JOB_DESCRIPTION]))[0]
+    jd_cand = unit(candidate.encode([JOB_DESCRIPTION]))[0]
+    score_diff = np.abs(ref @ jd_ref * 100 - cand @ jd_cand * 100)
+
+    passed = cosines.min() >= min_cosine and score_diff.max() <= max_score_diff
+    print(f"  parity: min cosine {cosines.min():.5f} (>= {min_cosine}), "
+          f"max score diff {score_diff.max():.3f} (<= {max_score_diff}) -> {'ok' if passed else 'FAIL'}")
+    return passed
+
+
+def measure_speed(encoder, texts, batch_sizes, runs):
+    for batch_size in batch_sizes:
+        started = time.perf_counter()
+        encoder.encode(texts, batch_size=batch_size)
+        elapsed = time.perf_counter() - started
+        print(f"  batch {batch_size:>3}: {len(texts) / elapsed:8.1f} texts/s")
+
+    latencies = []
+    for i in range(runs):
+        pair = [texts[i % len(texts)], JOB_DESCRIPTION]
+        started = time.perf_counter()
+        encoder.encode(pair)
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"  2-text call: p50 {statistics.median(latencies):.2f} ms   p95 {p95:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8"])
+    parser.add_argument("--texts", type=int, default=256)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--threads", type=int, default=None, help="onnxruntime intra-op threads")
+    parser.add_argument("--min-cosine", type=float, default=None, help="override the per-backend default")
+    parser.add_argument("--max-score-diff", type=float, default=2.0)
+    args = parser.parse_args()
+
+    texts = corpus(args.texts)
+    reference = load_backend("torch", args.threads)
+    failed = []
+
+    for name in args.backends:
+        encoder = reference if name == "torch" else load_backend(name, args.threads)
+        print(f"\n{name}")
+        if name != "torch":
+            min_cosine = args.min_cosine if args.min_cosine is not None else DEFAULT_MIN_COSINE[name]
+            if not check_parity(reference, encoder, texts, min_cosine, args.max_score_diff):
+                failed.append(name)
+        measure_speed(encoder, texts, args.batch_sizes, args.runs)
+
+    if failed:
+        print(f"\nParity failed for: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Memory of N workers holding the GloVe vectors: private heap copy vs mmap.
+
+Starts --workers processes per mode. Each one loads the vectors, touches
+every row (so mmapped pages are really faulted in) and then waits until all
+of its siblings have done the same before reading /proc/self/smaps_rollup.
+RSS counts shared page-cache pages in every worker. PSS splits them between
+the workers that share them, so the PSS total is the real memory cost.
+
+  heap  KeyedVectors.load(path): each worker owns a copy, like api.load did
+  mmap  KeyedVectors.load(path, mmap="r"): what the model registry does now
+
+Usage (from backend/, Linux only):
+    python benchmarks/bench_glove_rss.py [--workers 4] [--kv data/glove-wiki-gigaword-100.kv]
+    python benchmarks/bench_glove_rss.py --synthetic   # same shape, random vectors
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+WORKER = """
+import json, sys, time
+from gensim.models import KeyedVectors
+
+started = time.perf_counter()
+vectors = KeyedVectors.load(sys.argv[1], mmap=None if sys.argv[2] == "heap" else "r")
+float(vectors.vectors.sum())  # fault in every page
+load_seconds = time.perf_counter() - started
+
+print("loaded", flush=True)
+sys.stdin.readline()  # wait until every worker is loaded
+
+memory = {}
+with open("/proc/self/smaps_rollup") as smaps:
+    for line in smaps:
+        field, _, value = line.partition(":")
+        if field in ("Rss", "Pss"):
+            memory[field.lower() + "_mb"] = int(value.split()[0]) / 1024
+print(json.dumps({"load_seconds": load_seconds, **memory}), flush=True)
+"""
+
+
+def build_synthetic(path, words=400_000, dims=100):
+    """A store shaped like glove-wiki-gigaword-100 for machines without the real vectors."""
+    import numpy as np
+    from gensim.models import KeyedVectors
+
+    vectors = KeyedVectors(vector_size=dims)
+    vectors.add_vectors(
+        [f"word{i}" for i in range(words)],
+        np.random.default_rng(0).standard_normal((words, dims), dtype=np.float32),
+    )
+    vectors.save(path, sep_limit=0)
+
+
+def run_mode(path, mode, workers):
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-c", WORKER, path, mode],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        for _ in range(workers)
+    ]
+    for proc in procs:
+        proc.stdout.readline()
+    for proc in procs:
+        proc.stdin.write("go\n")
+        proc.stdin.flush()
+    results = [json.loads(proc.stdout.readline()) for proc in procs]
+    for proc in procs:
+        proc.stdin.close()
+        proc.wait()
+    return results
+
+
+def main():
+    from services.model_registry import GLOVE_KV_PATH
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--kv", default=GLOVE_KV_PATH)
+    parser.add_argument("--synthetic", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.kv
+        if args.synthetic:
+            path = os.path.join(tmp, "synthetic.kv")
+            build_synthetic(path)
+        elif not os.path.exists(path):
+            sys.exit(f"{path} not found; run scripts/convert_glove.py or pass --synthetic")
+
+        for mode in ("heap", "mmap"):
+            results = run_mode(path, mode, args.workers)
+            rss = sum(r["rss_mb"] for r in results)
+            pss = sum(r["pss_mb"] for r in results)
+            load = max(r["load_seconds"] for r in results)
+            print(f"{mode:<5} {args.workers} workers: RSS total {rss:8.1f} MB   "
+                  f"PSS total {pss:8.1f} MB   slowest load {load:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
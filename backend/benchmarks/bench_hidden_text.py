@@ -0,0 +1,202 @@
+"""
+Benchmark hidden-text detection on a resume PDF.
+
+Compares three strategies, each in a fresh subprocess so peak RSS is
+measured separately:
+  per_span    the original behaviour, one full-page raster per span
+  page_cache  one raster per page shared by all of its spans
+  tiered      analyze_document (uncached): geometry first, rasterizing
+              only the box of each span geometry cannot settle
+
+Usage (from backend/):
+    python benchmarks/bench_hidden_text.py [resume.pdf ...] [--runs 5]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def build_sample_resume(pages=2, lines_per_page=55):
+    """Build a dense resume-like PDF with a few hidden spans on every page."""
+    import fitz
+
+    doc = fitz.open()
+    for page_number in range(pages):
+        page = doc.new_page()
+        page.draw_rect(fitz.Rect(40, 60, 560, 90), color=None, fill=(0.9, 0.9, 1.0))
+        y = 80
+        for i in range(lines_per_page):
+            color = (1, 1, 1) if i % 11 == 0 else (0, 0, 0)
+            page.insert_text(
+                (50, y),
+                f"Experience {page_number}.{i}: Python, FastAPI, MongoDB, Docker",
+                fontsize=9,
+                color=color,
+            )
+            page.insert_text((360, y), "Kubernetes AWS", fontsize=9, color=(0.2, 0.2, 0.6))
+            y += 13
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+class PageRaster:
+    """
+    A page rendered once, exposed as a zero-copy (height, width, n) uint8 view
+    of the pixmap samples. The view is only valid while this object (and so
+    the pixmap) is alive, so callers drop the whole raster when the page is done.
+    """
+
+    def __init__(self, page, dpi):
+        import numpy as np
+
+        self.pix = page.get_pixmap(dpi=dpi)
+        self.zoom = dpi / 72
+
+        samples = getattr(self.pix, "samples_mv", None)
+        if samples is None:
+            samples = self.pix.samples
+
+        self.pixels = np.frombuffer(samples, dtype=np.uint8).reshape(
+            self.pix.height, self.pix.width, self.pix.n
+        )
+
+
+def get_word_highlight_color(page, rect, text_rgb, raster=None):
+    """Background of a span sampled from a full-page raster, rendering one if none is given."""
+    from services.pdf_visibility import RASTER_DPI, dominant_color
+
+    if raster is None:
+        raster = PageRaster(page, RASTER_DPI)
+
+    height, width = raster.pixels.shape[:2]
+    zoom = raster.zoom
+
+    x0 = int(rect.x0 * zoom)
+    y0 = int(rect.y0 * zoom)
+    x1 = int(rect.x1 * zoom)
+    y1 = int(rect.y1 * zoom)
+
+    # Sample the middle band of the span, where the background shows between glyphs
+    mid_y0 = y0 + int((y1 - y0) * 0.35)
+    mid_y1 = y0 + int((y1 - y0) * 0.65)
+
+    band = raster.pixels[
+        max(mid_y0, 0):min(mid_y1, height),
+        max(x0, 0):min(x1, width),
+        :3,
+    ]
+
+    return dominant_color(band, text_rgb)
+
+
+def run_raster(pdf_bytes, share_page_raster):
+    import fitz
+    from services.pdf_visibility import RASTER_DPI, is_text_visible, rgb_from_int
+
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    hidden = []
+    for page in doc:
+        raster = PageRaster(page, RASTER_DPI) if share_page_raster else None
+        for block in page.get_text("dict")["blocks"]:
+            for line in block.get("lines", []):
+                for span in line["spans"]:
+                    if not span["text"].strip():
+                        continue
+                    text_rgb = rgb_from_int(span["color"])
+                    bg = get_word_highlight_color(page, fitz.Rect(span["bbox"]), text_rgb, raster=raster)
+                    visible, _ = is_text_visible(text_rgb, bg, span["size"])
+                    if not visible:
+                        hidden.append(span["text"])
+    doc.close()
+    return hidden
+
+
+def run_tiered(pdf_bytes):
+    # Not through the document cache, which would answer every repeat run
+    from services.document_analysis import analyze_document
+    from services.pdf_visibility import record_tier_stats
+
+    document = analyze_document(pdf_bytes)
+    record_tier_stats(document["tier_stats"])
+    return document["hidden_spans"]
+
+
+MODES = {
+    "per_span": lambda pdf_bytes: run_raster(pdf_bytes, share_page_raster=False),
+    "page_cache": lambda pdf_bytes: run_raster(pdf_bytes, share_page_raster=True),
+    "tiered": run_tiered,
+}
+
+
+def measure(mode, paths, runs):
+    pdfs = [open(p, "rb").read() for p in paths] if paths else [build_sample_resume()]
+    import resume_screening  # noqa: F401  same imports in every mode keeps peak RSS comparable
+
+    fn = MODES[mode]
+    fn(pdfs[0])  # warm-up (imports, font caches)
+
+    timings = []
+    hidden_total = 0
+    for _ in range(runs):
+        for pdf_bytes in pdfs:
+            start = time.perf_counter()
+            hidden_total += len(fn(pdf_bytes))
+            timings.append(time.perf_counter() - start)
+
+    timings.sort()
+    result = {
+        "mode": mode,
+        "resumes": len(timings),
+        "median_ms": round(timings[len(timings) // 2] * 1000, 1),
+        "mean_ms": round(sum(timings) / len(timings) * 1000, 1),
+        # ru_maxrss is reported in KiB on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "hidden_spans": hidden_total // runs,
+    }
+    if mode == "tiered":
+        from services.pdf_visibility import get_tier_stats
+
+        stats = get_tier_stats()
+        result["raster_share"] = stats["raster_share"]
+        result["pages_skipped"] = stats["pages_skipped"]
+        result["regions_rendered"] = stats["regions_rendered"]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdfs", nargs="*", help="resume PDFs (a synthetic 2-page resume is used if omitted)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--mode", choices=sorted(MODES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(measure(args.mode, args.pdfs, args.runs)))
+        return
+
+    results = []
+    for mode in ("per_span", "page_cache", "tiered"):
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--mode", mode, "--runs", str(args.runs), *args.pdfs],
+            cwd=BACKEND_DIR, check=True, capture_output=True, text=True,
+        )
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    print(f"{'mode':<12}{'resumes':>9}{'median ms':>12}{'mean ms':>10}{'peak RSS MB':>13}{'hidden':>8}")
+    for r in results:
+        print(f"{r['mode']:<12}{r['resumes']:>9}{r['median_ms']:>12}{r['mean_ms']:>10}{r['peak_rss_mb']:>13}{r['hidden_spans']:>8}")
+    before, after = results[0], results[-1]
+    print(f"\nspeed-up: {before['median_ms'] / max(after['median_ms'], 0.1):.1f}x")
+    print(f"spans needing a raster: {after['raster_share']:.1%}, pages never rendered: {after['pages_skipped']}")
+
+
+if __name__ == "__main__":
+    main()
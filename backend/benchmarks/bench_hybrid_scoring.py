@@ -0,0 +1,107 @@
+"""
+Benchmark hybrid resume scoring against one JD at 1, 10 and 100 resumes.
+
+  per_pair  the original flow: analyze_resume_vs_job per resume, with two
+            encode([text, jd]) calls each (the JD is re-encoded every time)
+  batched   score_resumes_vs_job: one encode call for every resume text,
+            the JD embedding served from its LRU cache, one matrix product
+
+Needs the sentence transformer and the converted GloVe vectors
+(scripts/convert_glove.py). Models are loaded before timing starts.
+
+Usage (from backend/):
+    python benchmarks/bench_hybrid_scoring.py [--sizes 1 10 100] [--runs 3]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import pandas as pd
+from sklearn.metrics.pairwise import cosine_similarity
+
+import pdf_color_extractor as scoring
+from services.model_registry import get_sentence_model, get_word_vectors
+
+JOB_DESCRIPTION = (
+    "Backend developer with Python, FastAPI and Django experience. Design REST APIs and "
+    "microservices, work with PostgreSQL and MongoDB, deploy with Docker and Kubernetes on AWS, "
+    "build CI/CD pipelines and mentor junior engineers."
+)
+
+SKILLS = [
+    "python", "fastapi", "django", "flask", "rest", "apis", "microservices", "postgresql", "mongodb",
+    "redis", "docker", "kubernetes", "aws", "gcp", "terraform", "kafka", "react", "typescript", "java",
+]
+
+
+def synthetic_resume(rng, lines=60):
+    rows = []
+    for i in range(lines):
+        words = rng.sample(SKILLS, 4)
+        rows.append({"Text": f"Built services using {' '.join(words)} for team {i}", "Visible": True})
+    for _ in range(rng.randint(0, 3)):
+        rows.append({"Text": " ".join(rng.sample(SKILLS, 6)), "Visible": False})
+    return pd.DataFrame(rows)
+
+
+def per_pair_semantic(text, job_description):
+    embeddings = get_sentence_model().encode([text, job_description])
+    return round(cosine_similarity([embeddings[0]], [embeddings[1]])[0][0] * 100, 2)
+
+
+def score_per_pair(dfs, job_description):
+    scores = []
+    for df in dfs:
+        _, visible_text, invisible_text = scoring.get_resume_versions(df)
+        semantic_visible = per_pair_semantic(visible_text, job_description)
+        semantic_invisible = per_pair_semantic(invisible_text, job_description)
+        word2vec = scoring.calculate_word2vec_similarity(visible_text, job_description)
+        scores.append((
+            scoring._hybrid_score(semantic_visible, word2vec, scoring.calculate_skill_match(visible_text, job_description)),
+            scoring._hybrid_score(semantic_invisible, word2vec, scoring.calculate_skill_match(invisible_text, job_description)),
+        ))
+    return scores
+
+
+def score_batched(dfs, job_description):
+    return scoring.score_resumes_vs_job(dfs, job_description)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    get_sentence_model()
+    get_word_vectors()
+    rng = random.Random(0)
+
+    for size in args.sizes:
+        dfs = [synthetic_resume(rng) for _ in range(size)]
+        results = {}
+        for name, fn in (("per_pair", score_per_pair), ("batched", score_batched)):
+            timings = []
+            for _ in range(args.runs):
+                scoring._jd_embeddings.clear()  # the first batch of a request pays for the JD
+                started = time.perf_counter()
+                results[name] = fn(dfs, JOB_DESCRIPTION)
+                timings.append(time.perf_counter() - started)
+            print(f"{size:>4} resumes  {name:<9} median {statistics.median(timings) * 1000:9.1f} ms")
+
+        drift = max(
+            abs(a - b)
+            for old, new in zip(results["per_pair"], results["batched"])
+            for a, b in zip(old, new)
+        )
+        print(f"{'':>4}           max score difference {drift:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Offline evaluation of near-duplicate JD detection (services/near_duplicate.py).
+
+The bundled corpus (benchmarks/data/jd_corpus.jsonl) holds distinct job
+descriptions, several of them for the same role at different companies, so
+they share vocabulary without being duplicates. From each JD the script
+derives edited copies the way reposted JDs differ:
+
+  whitespace   reflowed lines, different bullets and capitalisation
+  edit_line    one requirement changed (years of experience, or a line
+               swapped for one from another JD)
+  drop_line    one line removed
+  reorder      two lines swapped
+  boilerplate  an equal-opportunity or benefits paragraph appended
+
+For each threshold the corpus is indexed and every copy is looked up:
+  hit rate     copies mapped back to their own JD
+  wrong match  copies mapped to a different JD
+  false match  corpus JDs mapped to another corpus JD (looked up against an
+               index of all the others), the rate that matters for
+               reusing someone else's analysis
+  templated    the same, after wrapping every JD in one company's intro,
+               benefits and equal-opportunity text, as when one employer
+               posts different roles from a single template
+
+Usage (from backend/):
+    python benchmarks/bench_jd_dedup.py [--thresholds 0.6 0.7 0.8 0.9 0.95] [--copies 5]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from services.near_duplicate import NearDuplicateIndex, signature, similarity
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "jd_corpus.jsonl")
+
+BOILERPLATE = [
+    "We are an equal opportunity employer and value diversity. We do not discriminate on the basis of "
+    "race, religion, colour, national origin, gender, sexual orientation, age, marital status or disability.",
+    "Benefits: competitive salary, private health insurance, 25 days of holiday, a learning budget, "
+    "flexible working hours and a hybrid office policy.",
+]
+
+
+COMPANY_TEMPLATE = (
+    "About us: Northwind Labs builds software that helps logistics companies plan routes, track "
+    "shipments and cut fuel costs. Founded in 2012, we are 400 people across London, Berlin and "
+    "Toronto, backed by leading investors and profitable since 2019.",
+    "\n".join(BOILERPLATE) + "\nTo apply, send your CV and a short note about why this role interests you.",
+)
+
+
+def load_corpus(path=CORPUS_PATH):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def whitespace(lines, rng, others):
+    bullets = ["* ", "• ", "  -  ", ""]
+    bullet = rng.choice(bullets)
+    return [line.replace("- ", bullet, 1).upper() if i == 0 else line.replace("- ", bullet, 1) for i, line in enumerate(lines)]
+
+
+def edit_line(lines, rng, others):
+    lines = list(lines)
+    with_years = [i for i, line in enumerate(lines) if "+ years" in line]
+    if with_years and rng.random() < 0.5:
+        i = rng.choice(with_years)
+        lines[i] = lines[i].replace("+ years", "+ years (or equivalent)").replace("2+", "4+").replace("3+", "5+")
+    else:
+        i = rng.randrange(1, len(lines))
+        donor = rng.choice(others)["text"].splitlines()
+        lines[i] = rng.choice(donor[1:])
+    return lines
+
+
+def drop_line(lines, rng, others):
+    i = rng.randrange(1, len(lines))
+    return lines[:i] + lines[i + 1:]
+
+
+def reorder(lines, rng, others):
+    lines = list(lines)
+    i, j = rng.sample(range(1, len(lines)), 2)
+    lines[i], lines[j] = lines[j], lines[i]
+    return lines
+
+
+def boilerplate(lines, rng, others):
+    return list(lines) + ["", rng.choice(BOILERPLATE)]
+
+
+EDITS = {
+    "whitespace": whitespace,
+    "edit_line": edit_line,
+    "drop_line": drop_line,
+    "reorder": reorder,
+    "boilerplate": boilerplate,
+}
+
+
+def make_copies(corpus, copies, seed=0):
+    rng = random.Random(seed)
+    result = []
+    for jd in corpus:
+        others = [other for other in corpus if other["id"] != jd["id"]]
+        for edit_name, edit in EDITS.items():
+            for _ in range(copies):
+                text = "\n".join(edit(jd["text"].splitlines(), rng, others))
+                result.append((jd["id"], edit_name, text))
+    return result
+
+
+def false_matches(corpus, signatures, threshold):
+    """Corpus JDs that match another corpus JD, each looked up against all the others."""
+    found = []
+    for jd in corpus:
+        held_out = NearDuplicateIndex(threshold=threshold, max_entries=len(corpus))
+        for other in corpus:
+            if other["id"] != jd["id"]:
+                held_out.add(other["id"], signatures[other["id"]], other["id"])
+        match = held_out.query(signatures[jd["id"]])
+        if match is not None:
+            found.append((jd["id"], match[1], round(match[2], 3)))
+    return found
+
+
+def closest_pair(signatures):
+    """The most similar pair of different JDs: how far below it a threshold sits is the safety margin."""
+    ids = list(signatures)
+    return max(
+        (similarity(signatures[a], signatures[b]), a, b)
+        for i, a in enumerate(ids) for b in ids[i + 1:]
+    )
+
+
+def evaluate(corpus, signatures, copies, threshold):
+    index = NearDuplicateIndex(threshold=threshold, max_entries=len(corpus))
+    for jd in corpus:
+        index.add(jd["id"], signatures[jd["id"]], jd["id"])
+
+    per_edit = {name: [0, 0, 0] for name in EDITS}  # hits, wrong, total
+    timings = []
+    for jd_id, edit_name, text in copies:
+        started = time.perf_counter()
+        match = index.query(signature(text))
+        timings.append((time.perf_counter() - started) * 1000)
+        counts = per_edit[edit_name]
+        counts[2] += 1
+        if match is not None:
+            counts[0 if match[1] == jd_id else 1] += 1
+    return index, per_edit, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.6, 0.7, 0.8, 0.9, 0.95])
+    parser.add_argument("--copies", type=int, default=5, help="edited copies per JD and edit type")
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    copies = make_copies(corpus, args.copies)
+    signatures = {jd["id"]: signature(jd["text"]) for jd in corpus}
+    intro, outro = COMPANY_TEMPLATE
+    templated = {jd["id"]: signature(f"{intro}\n\n{jd['text']}\n\n{outro}") for jd in corpus}
+    print(f"{len(corpus)} JDs, {len(copies)} edited copies")
+    for name, group in (("plain", signatures), ("templated", templated)):
+        score, a, b = closest_pair(group)
+        print(f"closest different JDs ({name}): {score:.3f}  {a} / {b}")
+
+    header = "".join(f"{name:>13}" for name in EDITS)
+    print(f"\n{'threshold':>9}{'bands':>7}{header}{'hit rate':>10}{'wrong':>7}{'false':>7}{'templated':>11}{'p50 ms':>8}")
+    for threshold in args.thresholds:
+        index, per_edit, timings = evaluate(corpus, signatures, copies, threshold)
+        found = false_matches(corpus, signatures, threshold)
+        found_templated = false_matches(corpus, templated, threshold)
+        hits = sum(counts[0] for counts in per_edit.values())
+        wrong = sum(counts[1] for counts in per_edit.values())
+        cells = "".join(f"{counts[0] / counts[2]:>13.2f}" for counts in per_edit.values())
+        print(f"{threshold:>9.2f}{f'{index.bands}x{index.rows}':>7}{cells}"
+              f"{hits / len(copies):>10.3f}{wrong / len(copies):>7.3f}{len(found) / len(corpus):>7.3f}"
+              f"{len(found_templated) / len(corpus):>11.3f}"
+              f"{statistics.median(timings):>8.2f}")
+        for jd_id, matched_id, score in found + found_templated:
+            print(f"{'':>16}false match: {jd_id} -> {matched_id} ({score})")
+
+
+if __name__ == "__main__":
+    main()
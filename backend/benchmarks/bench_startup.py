@@ -0,0 +1,77 @@
+"""
+Measure import and model-load time for the scoring code.
+
+Each step runs in a fresh interpreter so nothing is already imported:
+  import_extractor   import pdf_color_extractor (models are lazy now)
+  import_app         import the FastAPI app module
+  eager_equivalent   import pdf_color_extractor and load both models, which
+                     is what every worker paid at import time before the
+                     model registry
+  model loads        per-model load seconds as reported by the registry
+
+Usage (from backend/):
+    python benchmarks/bench_startup.py [--runs 3]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STEPS = {
+    "import_extractor": "import pdf_color_extractor",
+    "import_app": "import app",
+    "eager_equivalent": (
+        "import pdf_color_extractor\n"
+        "from services.model_registry import registry, warm_up\n"
+        "warm_up(registry.names())\n"
+    ),
+}
+
+TIMER = """
+import json, time
+started = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - started
+from services.model_registry import registry
+print(json.dumps({{"seconds": elapsed, "models": registry.status()}}))
+"""
+
+
+def run_step(code):
+    output = subprocess.run(
+        [sys.executable, "-c", TIMER.format(code=code)],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    for name, code in STEPS.items():
+        try:
+            results = [run_step(code) for _ in range(args.runs)]
+        except subprocess.CalledProcessError as exc:
+            print(f"{name:<18} failed: {exc.stderr.strip().splitlines()[-1]}")
+            continue
+
+        seconds = [result["seconds"] for result in results]
+        print(f"{name:<18} median {statistics.median(seconds):7.3f}s   min {min(seconds):7.3f}s")
+        for model, status in results[-1]["models"].items():
+            if status["state"] == "ready":
+                print(f"{'':<18} {model} loaded in {status['load_seconds']}s")
+            elif status["state"] == "failed":
+                print(f"{'':<18} {model} failed: {status['error']}")
+
+
+if __name__ == "__main__":
+    main()
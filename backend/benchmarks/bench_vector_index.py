@@ -0,0 +1,109 @@
+"""
+Benchmark the IVF vector index at 100k synthetic resume embeddings.
+
+Reports:
+  build     add() of every vector, appending to the memory-mapped store
+  train     k-means over about sqrt(n) clusters
+  reload    opening the index from disk (a restart)
+  exact     brute-force search latency over every vector, p50 and p95
+  nprobe    recall@k against exact search, and latency, per --nprobe value
+  delete    deleted vectors never come back from a search
+
+Vectors are unit-length with --dim dimensions (384, as all-MiniLM-L6-v2),
+drawn around a few hundred random "topics" so neighbourhoods are clustered
+the way resume embeddings are; queries come from the same topics. Raising
+--spread blurs the topics together, which is harder for IVF (at 3.0 the
+vectors are close to uniform noise and recall drops sharply).
+
+Usage (from backend/):
+    python benchmarks/bench_vector_index.py [--size 100000] [--spread 1.5] [--queries 200] [--nprobe 1 4 8 16 32]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import numpy as np
+
+from services.vector_index import VectorIndex
+
+
+def clustered_vectors(count, dim, topics, spread, rng):
+    centres = rng.standard_normal((topics, dim)).astype(np.float32)
+    centres /= np.linalg.norm(centres, axis=1, keepdims=True)
+    noise = rng.standard_normal((count, dim)).astype(np.float32) * spread / np.sqrt(dim)
+    vectors = centres[rng.integers(0, topics, count)] + noise
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def percentile(samples, pct):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct))]
+
+
+def timed_searches(index, queries, top_k, **options):
+    results, timings = [], []
+    for query in queries:
+        started = time.perf_counter()
+        results.append([item_id for item_id, _, _ in index.search(query, top_k, **options)])
+        timings.append((time.perf_counter() - started) * 1000)
+    return results, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--topics", type=int, default=500)
+    parser.add_argument("--spread", type=float, default=1.5,
+                        help="noise around each topic; higher overlaps topics and lowers recall")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = clustered_vectors(args.size + args.queries, args.dim, args.topics, args.spread, rng)
+    vectors, queries = vectors[:args.size], vectors[args.size:]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        index = VectorIndex(tmp)
+        for i, vector in enumerate(vectors):
+            index.add(f"resume{i}", vector, name=f"resume{i}.pdf")
+        print(f"build      {time.perf_counter() - started:8.2f} s   "
+              f"store {os.path.getsize(os.path.join(tmp, 'vectors.f32')) / 2**20:.0f} MB")
+
+        started = time.perf_counter()
+        index.train()
+        print(f"train      {time.perf_counter() - started:8.2f} s   {index.stats()['clusters']} clusters")
+
+        started = time.perf_counter()
+        index = VectorIndex(tmp)
+        print(f"reload     {time.perf_counter() - started:8.2f} s")
+
+        expected, timings = timed_searches(index, queries, args.top_k, exact=True)
+        print(f"exact      p50 {statistics.median(timings):7.2f} ms   p95 {percentile(timings, 0.95):7.2f} ms")
+
+        for nprobe in args.nprobe:
+            found, timings = timed_searches(index, queries, args.top_k, nprobe=nprobe)
+            recall = np.mean([len(set(a) & set(b)) / len(b) for a, b in zip(found, expected)])
+            print(f"nprobe {nprobe:>3} p50 {statistics.median(timings):7.2f} ms   "
+                  f"p95 {percentile(timings, 0.95):7.2f} ms   recall@{args.top_k} {recall:.3f}")
+
+        removed = {item_id for ids in expected[:20] for item_id in ids[:3]}
+        for item_id in removed:
+            index.delete(item_id)
+        index = VectorIndex(tmp)
+        found, _ = timed_searches(index, queries[:20], args.top_k)
+        leaked = removed & {item_id for ids in found for item_id in ids}
+        print(f"delete     {len(removed)} removed, {len(leaked)} returned after reload   {index.stats()}")
+
+
+if __name__ == "__main__":
+    main()
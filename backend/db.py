@@ -1,5 +1,6 @@
 import os
-from pymongo import MongoClient
+from pymongo import ASCENDING, DESCENDING, AsyncMongoClient, MongoClient
+from pymongo.errors import OperationFailure
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -7,12 +8,138 @@ load_dotenv()
 MONGO_URI = os.getenv("MONGO_URI")
 DB_NAME = os.getenv("DB_NAME")
 
-# Create MongoDB client
-client = MongoClient(MONGO_URI)
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_TIMEOUT_MS = int(os.getenv("MONGO_TIMEOUT_MS", "5000"))
+# With 0 the app only checks that the indexes below exist (e.g. when they are
+# managed outside the app) and still refuses to start if one is missing.
+MONGO_MANAGE_INDEXES = os.getenv("MONGO_MANAGE_INDEXES", "1") == "1"
 
-# Access database
-db = client[DB_NAME]
+# Every index the app relies on: collection -> [(keys, options)].
+# User lookups, quota reservations and licence checks all filter on a single
+# email, so the unique email index serves every one of them; it also stops
+# concurrent upserts from creating the same user twice.
+INDEXES = {
+    "auth": [
+        ([("email", ASCENDING)], {"name": "email_unique", "unique": True}),
+    ],
+    "llm_cache": [
+        ([("expires_at", ASCENDING)], {"name": "expires_at_ttl", "expireAfterSeconds": 0}),
+    ],
+    # Stored analyses are looked up by key from any user (the key prefix) and
+    # kept once per user; history pages walk one user's entries newest first.
+    "analyses": [
+        ([("key", ASCENDING), ("email", ASCENDING)], {"name": "key_email_unique", "unique": True}),
+        ([("email", ASCENDING), ("_id", DESCENDING)], {"name": "email_history"}),
+    ],
+}
 
-print("✅ MongoDB Connected Successfully!")
+# Index options that change behaviour, so an existing index must match them exactly
+_CHECKED_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
 
-auth_collection = db["auth"]
\ No newline at end of file
+# The async client is created in the app lifespan (connect/close below), not
+# at import time, so importing this module never opens a connection.
+client = None
+db = None
+
+_sync_client = None
+
+
+def _client_options():
+    return {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "serverSelectionTimeoutMS": MONGO_TIMEOUT_MS,
+        "connectTimeoutMS": MONGO_TIMEOUT_MS,
+        "socketTimeoutMS": MONGO_TIMEOUT_MS,
+    }
+
+
+async def connect():
+    global client, db
+    if client is None:
+        client = AsyncMongoClient(MONGO_URI, **_client_options())
+        db = client[DB_NAME]
+        await client.admin.command("ping")
+        print("✅ MongoDB Connected Successfully!")
+        await ensure_indexes(db, create=MONGO_MANAGE_INDEXES)
+    return db
+
+
+async def close():
+    global client, db
+    if client is not None:
+        await client.close()
+        client = None
+        db = None
+
+
+def _index_problem(collection_name, keys, options, existing):
+    """Why the existing indexes do not satisfy a declared one: None, "missing" or a conflict."""
+    name = options["name"]
+    for index_name, info in existing.items():
+        same_keys = list(info["key"]) == keys
+        if not same_keys and index_name != name:
+            continue
+        if not same_keys:
+            return f"{collection_name}.{index_name} exists with keys {info['key']}, expected {keys}"
+        for option in _CHECKED_OPTIONS:
+            if info.get(option) != options.get(option):
+                return (
+                    f"{collection_name}.{index_name} on {keys} has {option}={info.get(option)!r}, "
+                    f"expected {options.get(option)!r}; drop it so it can be recreated"
+                )
+        return None
+    return "missing"
+
+
+async def ensure_indexes(database, create=True):
+    """
+    Create the declared INDEXES idempotently and verify them.
+
+    Raises RuntimeError, which aborts startup, when an existing index conflicts
+    with the declaration, when one is missing and create is off, or when
+    creation fails (e.g. a unique email index over duplicate users).
+    """
+    for collection_name, specs in INDEXES.items():
+        collection = database[collection_name]
+        existing = await collection.index_information()
+
+        for keys, options in specs:
+            problem = _index_problem(collection_name, keys, options, existing)
+            if problem is None:
+                continue
+            if problem != "missing":
+                raise RuntimeError(f"Index conflict: {problem}")
+            if not create:
+                raise RuntimeError(f"Missing index {collection_name}.{options['name']} on {keys}")
+
+            try:
+                await collection.create_index(keys, **options)
+            except OperationFailure as exc:
+                raise RuntimeError(
+                    f"Could not create index {collection_name}.{options['name']} on {keys}: {exc}"
+                ) from exc
+
+            existing = await collection.index_information()
+            if _index_problem(collection_name, keys, options, existing) is not None:
+                raise RuntimeError(f"Index {collection_name}.{options['name']} missing after creation")
+            print(f"✅ Created index {collection_name}.{options['name']}")
+
+
+def get_db():
+    if db is None:
+        raise RuntimeError("MongoDB is not connected; call db.connect() in the app lifespan first")
+    return db
+
+
+def get_auth_collection():
+    return get_db()["auth"]
+
+
+def get_sync_db():
+    """Blocking client for scripts and other code that runs outside the event loop."""
+    global _sync_client
+    if _sync_client is None:
+        _sync_client = MongoClient(MONGO_URI, **_client_options())
+    return _sync_client[DB_NAME]
@@ -2,15 +2,18 @@
 import json
 import os
 import certifi
-from openai import OpenAI
 import requests
 from fastapi import FastAPI, HTTPException, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
 from pypdf import PdfReader
 from dotenv import load_dotenv
 
+from services.ai_service import generate_response
+
 load_dotenv()
 
+# Stored analyses are keyed on this; bump it when the analyze_skill_gap prompt changes
+SKILL_GAP_PROMPT_VERSION = "1"
 
 
 def extract_text_from_pdf(file):
@@ -23,7 +26,7 @@ def extract_text_from_pdf(file):
     return text
 
 
-def analyze_skill_gap(resume_text, job_description=None, job_role=None):
+async def analyze_skill_gap(resume_text, job_description=None, job_role=None):
 
     comparison_target = ""
 
@@ -56,11 +59,7 @@ def analyze_skill_gap(resume_text, job_description=None, job_role=None):
     }}
     """
 
-    ai_text = generate_response(prompt)
-
-    # If API failed
-    if ai_text.startswith("Error:"):
-        raise HTTPException(status_code=500, detail=ai_text)
+    ai_text = await generate_response(prompt)
 
     try:
         # Remove markdown formatting if model adds ```
@@ -71,27 +70,3 @@ def analyze_skill_gap(resume_text, job_description=None, job_role=None):
 
     except Exception:
         return {"raw_response": ai_text}
-
-
-
-client = OpenAI(
-    api_key=os.getenv("OPENROUTER_API_KEY_B"),
-    base_url="https://openrouter.ai/api/v1"
-)
-
-def generate_response(prompt: str):
-    try:
-        response = client.chat.completions.create(
-            model="openai/gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are an expert career advisor and resume expert."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=1000
-        )
-
-        return response.choices[0].message.content
-
-    except Exception as e:
-        return f"Error: {str(e)}"
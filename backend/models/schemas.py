@@ -32,3 +32,14 @@ class PaymentVerifyRequest(BaseModel):
     razorpay_order_id: str
     razorpay_payment_id: str
     razorpay_signature: str
+
+
+class CandidateRankRequest(BaseModel):
+    job_description: str
+    top_k: int = 20
+
+
+class CandidateSearchRequest(BaseModel):
+    job_description: str
+    top_k: int = 20
+    include_text: bool = False
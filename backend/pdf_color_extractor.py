@@ -1,51 +1,100 @@
 from typing import Any, Dict
+import hashlib
 import fitz
 import os
-from collections import Counter
 import pandas as pd
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
-from rank_bm25 import BM25Okapi
 import numpy as np
-import gensim.downloader as api
-from gensim.models import KeyedVectors
-from sentence_transformers import SentenceTransformer
+
+from services.cache import LRUCache
+from services.document_analysis import compute_format_stats
+from services.embedding_batcher import get_embedding_batcher
+from services.model_registry import get_word_vectors
+from services.pdf_visibility import PageVisibility, record_tier_stats, rgb_from_int
 
 
 # ==============================
-# 1️⃣ Sentence Transformer Model
+# 1️⃣ Sentence Transformer Model (loaded on first use, see services/model_registry.py)
 # ==============================
 
-semantic_model = SentenceTransformer('all-MiniLM-L6-v2')
+# JD embeddings by content hash, so one JD is encoded once for a whole batch of resumes
+_jd_embeddings = LRUCache(max_entries=int(os.getenv("JD_EMBEDDING_CACHE_SIZE", "128")))
+
+
+def _text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def embed_texts(texts):
+    """
+    Unit-length embeddings for all texts, encoded together and micro-batched
+    with concurrent callers (services/embedding_batcher.py).
+    """
+    embeddings = np.asarray(get_embedding_batcher().encode(texts), dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / np.where(norms == 0, 1, norms)
+
+
+def calculate_semantic_similarities(texts, job_description):
+    """
+    Similarity (0-100) of every text to the JD: one encode call for the texts
+    (plus the JD on a cache miss) and one matrix product.
+    """
+    key = _text_hash(job_description)
+    jd_vector = _jd_embeddings.get(key)
+
+    batch = list(texts) if jd_vector is not None else [*texts, job_description]
+    if not batch:
+        return np.zeros(0)
+
+    embeddings = embed_texts(batch)
+    if jd_vector is None:
+        jd_vector = embeddings[-1]
+        jd_vector.setflags(write=False)
+        _jd_embeddings.set(key, jd_vector)
+        embeddings = embeddings[:-1]
+
+    return np.round(embeddings @ jd_vector * 100, 2)
+
 
 def calculate_semantic_similarity(text1, text2):
-    embeddings = semantic_model.encode([text1, text2])
-    similarity = cosine_similarity(
-        [embeddings[0]],
-        [embeddings[1]]
-    )[0][0]
-    return round(similarity * 100, 2)
+    return calculate_semantic_similarities([text1], text2)[0]
 
 # ==============================
-# 2️⃣ Word2Vec Model (Load your pretrained model)
+# 2️⃣ Word2Vec Model (pretrained GloVe, loaded on first use)
 # ==============================
 
-word2vec_model = api.load("glove-wiki-gigaword-100")
+# Mean vectors of recently seen texts (the same JD is scored against every resume in a batch)
+_sentence_vectors = LRUCache(max_entries=int(os.getenv("SENTENCE_VECTOR_CACHE_SIZE", "256")))
 
-def get_sentence_vector(text, model):
-    words = text.lower().split()
-    vectors = []
 
-    for word in words:
-        if word in model:
-            vectors.append(model[word])
+def text_to_indices(text, model):
+    """Vocabulary row of every in-vocabulary token, in one pass over the text."""
+    key_to_index = model.key_to_index
+    indices = np.fromiter((key_to_index.get(word, -1) for word in text.lower().split()), dtype=np.intp)
+    return indices[indices >= 0]
+
 
-    if len(vectors) == 0:
-        return np.zeros(model.vector_size)
+def get_sentence_vector(text, model):
+    key = (id(model), hashlib.sha256(text.encode("utf-8")).hexdigest())
+    vector = _sentence_vectors.get(key)
+    if vector is not None:
+        return vector
+
+    indices = text_to_indices(text, model)
+    if indices.size == 0:
+        vector = np.zeros(model.vector_size)
+    else:
+        # One gather and one reduce instead of a Python list of rows
+        vector = model.vectors[indices].mean(axis=0)
 
-    return np.mean(vectors, axis=0)
+    vector.setflags(write=False)  # shared by every caller that hits the cache
+    _sentence_vectors.set(key, vector)
+    return vector
 
 def calculate_word2vec_similarity(text1, text2):
+    word2vec_model = get_word_vectors()
     vec1 = get_sentence_vector(text1, word2vec_model)
     vec2 = get_sentence_vector(text2, word2vec_model)
 
@@ -72,11 +121,61 @@ def calculate_skill_match(resume, jd):
 
 
 
-def analyze_resume_vs_job(df, job_description):
+def _hybrid_score(semantic_score, word2vec_score, skill_score):
+    return 0.6 * semantic_score + 0.25 * word2vec_score + 0.15 * skill_score
+
 
-    all_text, visible_text, invisible_text = get_resume_versions(df)
+def score_texts_vs_job(resume_texts, job_description):
+    """
+    (final_score_visible, final_score_invisible) for every (visible_text,
+    invisible_text) pair, embedding all of the texts in one batch.
+    """
+    resume_texts = list(resume_texts)
+    texts = [text for pair in resume_texts for text in pair]
+    semantic_scores = calculate_semantic_similarities(texts, job_description)
+
+    scores = []
+    for i, (visible_text, invisible_text) in enumerate(resume_texts):
+        semantic_score_visible_text = semantic_scores[2 * i]
+        semantic_score_invisible_text = semantic_scores[2 * i + 1]
+
+        skill_score_visible_text = calculate_skill_match(visible_text, job_description)
+        skill_score_invisible_text = calculate_skill_match(invisible_text, job_description)
+
+        word2vec_score_visible_text = calculate_word2vec_similarity(visible_text, job_description)
+        word2vec_score_invisible_text = calculate_word2vec_similarity(visible_text, job_description)
+
+        scores.append((
+            _hybrid_score(semantic_score_visible_text, word2vec_score_visible_text, skill_score_visible_text),
+            _hybrid_score(semantic_score_invisible_text, word2vec_score_invisible_text, skill_score_invisible_text),
+        ))
+    return scores
+
+
+def score_visible_texts_vs_job(texts, job_description):
+    """Hybrid score of each text alone: the visible half of score_texts_vs_job."""
+    texts = list(texts)
+    semantic_scores = calculate_semantic_similarities(texts, job_description)
+    return [
+        _hybrid_score(
+            semantic_score,
+            calculate_word2vec_similarity(text, job_description),
+            calculate_skill_match(text, job_description),
+        )
+        for text, semantic_score in zip(texts, semantic_scores)
+    ]
+
+
+def score_resumes_vs_job(dfs, job_description):
+    """score_texts_vs_job for resume DataFrames from extract_text_with_highlight."""
+    versions = [get_resume_versions(df) for df in dfs]
+    return score_texts_vs_job(
+        [(visible_text, invisible_text) for _, visible_text, invisible_text in versions],
+        job_description,
+    )
 
 
+def analyze_resume_vs_job(df, job_description):
 
     print("\n📊 Resume Analysis Result")
     print("----------------------------------")
@@ -92,28 +191,8 @@ def analyze_resume_vs_job(df, job_description):
 
 
   
-    semantic_score_visible_text = calculate_semantic_similarity(visible_text, job_description)
-    semantic_score_invisible_text = calculate_semantic_similarity(invisible_text, job_description)
-
-
-    skill_score_visible_text = calculate_skill_match(visible_text, job_description)
-    skill_score_invisible_text = calculate_skill_match(invisible_text, job_description)
+    final_score_visible, final_score_invisible = score_resumes_vs_job([df], job_description)[0]
 
-    word2vec_score_visible_text  = calculate_word2vec_similarity(visible_text, job_description)
-    word2vec_score_invisible_text = calculate_word2vec_similarity(visible_text, job_description)
-
-    final_score_visible = (
-    0.6 * semantic_score_visible_text + 
-    0.25 * word2vec_score_visible_text + 
-    0.15 * skill_score_visible_text
-)
-    final_score_invisible = (
-    0.6 * semantic_score_invisible_text + 
-    0.25 * word2vec_score_invisible_text + 
-    0.15 * skill_score_invisible_text
-)
-
-    
 
     # print("Semantic Similarity Score(V):", semantic_score_visible_text, "%")
     # print("Semantic Similarity Score(I):", semantic_score_invisible_text, "%")
@@ -126,88 +205,6 @@ def analyze_resume_vs_job(df, job_description):
     return final_score_visible, final_score_invisible 
 
 
-def rgb_from_int(color):
-    return (color >> 16 & 255, color >> 8 & 255, color & 255)
-
-
-def get_word_highlight_color(page, rect, text_rgb):
-    pix = page.get_pixmap(dpi=200)
-    width, height = pix.width, pix.height
-    n = pix.n
-    img = pix.samples
-
-    zoom = 200 / 72
-
-    x0 = int(rect.x0 * zoom)
-    y0 = int(rect.y0 * zoom)
-    x1 = int(rect.x1 * zoom)
-    y1 = int(rect.y1 * zoom)
-
-    mid_y0 = y0 + int((y1 - y0) * 0.35)
-    mid_y1 = y0 + int((y1 - y0) * 0.65)
-
-    colors = []
-
-    for y in range(mid_y0, min(mid_y1, height)):
-        for x in range(x0, min(x1, width)):
-            idx = (y * width + x) * n
-            r, g, b = img[idx], img[idx + 1], img[idx + 2]
-
-            if abs(r - text_rgb[0]) < 20 and \
-               abs(g - text_rgb[1]) < 20 and \
-               abs(b - text_rgb[2]) < 20:
-                continue
-
-            colors.append((r, g, b))
-
-    if colors:
-        return Counter(colors).most_common(1)[0][0]
-    else:
-        return (255, 255, 255)
-
-def relative_luminance(rgb):
-    def convert(c):
-        c = c / 255
-        if c <= 0.03928:
-            return c / 12.92
-        else:
-            return ((c + 0.055) / 1.055) ** 2.4
-
-    r, g, b = rgb
-    r_lin = convert(r)
-    g_lin = convert(g)
-    b_lin = convert(b)
-
-    return 0.2126 * r_lin + 0.7152 * g_lin + 0.0722 * b_lin
-
-
-def contrast_ratio(rgb1, rgb2):
-    L1 = relative_luminance(rgb1)
-    L2 = relative_luminance(rgb2)
-
-    lighter = max(L1, L2)
-    darker = min(L1, L2)
-
-    return (lighter + 0.05) / (darker + 0.05)
-
-
-def is_text_visible(text_rgb, bg_rgb, font_size):
-    ratio = contrast_ratio(text_rgb, bg_rgb)
-
-    # Rule 1: Very small font
-    if font_size <= 5:
-        return False, ratio
-
-    # Rule 2: Very low contrast
-    if ratio < 1.5:
-        return False, ratio
-
-    # Rule 3: Weak contrast
-    if ratio < 3:
-        return "Hard to See", ratio
-
-    return True, ratio
-
 def get_resume_versions(df):
 
     all_text = " ".join(df["Text"].astype(str))
@@ -241,6 +238,8 @@ def extract_text_with_highlight(resume, output_file="output.txt"):
 
             blocks = page.get_text("dict")["blocks"]
 
+            visibility = PageVisibility(page)
+
             for block in blocks:
                 if "lines" not in block:
                     continue
@@ -251,19 +250,12 @@ def extract_text_with_highlight(resume, output_file="output.txt"):
                         text = span["text"]
                         if text.strip() == "":
                             continue
-                        rect = fitz.Rect(span["bbox"])
 
                         r, g, b = rgb_from_int(span["color"])
                         font_size = span["size"]
 
-                        highlight_rgb = get_word_highlight_color(
-                            page, rect, (r, g, b)
-                        )
-                        visible_status, ratio = is_text_visible(
-                            (r, g, b),
-                            highlight_rgb,
-                            font_size
-                        )
+                        visible_status, ratio, highlight_rgb = visibility.classify(span)
+
                         # Write to file
                         f.write("--------------------------------\n")
                         f.write(f"Text          : {text}\n")
@@ -273,13 +265,6 @@ def extract_text_with_highlight(resume, output_file="output.txt"):
                         f.write(f"Contrast Ratio : {round(ratio,2)}\n")
                         f.write(f"Visible        : {visible_status}\n\n")
 
-
-                        visible_status, ratio = is_text_visible(
-                            (r, g, b),
-                            highlight_rgb,
-                            font_size
-                        )
-
                         rows.append({
                             "Text": text,
                             "Font Size": font_size,
@@ -289,6 +274,8 @@ def extract_text_with_highlight(resume, output_file="output.txt"):
                             "Visible": visible_status
                         })
 
+            record_tier_stats(visibility.close())
+
     doc.close()
 
     # ✅ Convert list to DataFrame
@@ -331,41 +318,7 @@ def analyze_resume_format(pdf_file) -> float:
                         font_names.append(span["font"])
                         x_positions.append(span["bbox"][0])  # x0 of text = horizontal start
 
-    pdf_file.seek(0)  # reset pointer
-
-    # -----------------------------
-    # 1️⃣ Font size consistency
-    # -----------------------------
-    size_counter = Counter(font_sizes)
-    most_common_size_count = size_counter.most_common(1)[0][1] if size_counter else 0
-    font_size_score = (most_common_size_count / len(font_sizes)) * 100 if font_sizes else 0
-
-    # -----------------------------
-    # 2️⃣ Font name consistency
-    # -----------------------------
-    font_counter = Counter(font_names)
-    most_common_font_count = font_counter.most_common(1)[0][1] if font_counter else 0
-    font_name_score = (most_common_font_count / len(font_names)) * 100 if font_names else 0
-
-    # -----------------------------
-    # 3️⃣ Alignment consistency
-    # -----------------------------
-    # Approximate alignment: texts starting at similar x positions are aligned
-    if x_positions:
-        alignment_std = np.std(x_positions)
-        # Smaller std = better alignment
-        alignment_score = max(0, 100 - alignment_std*10)  # scale to 0-100
-    else:
-        alignment_score = 0
-
-    # -----------------------------
-    # 4️⃣ Combine scores
-    # -----------------------------
-    # Weight: font size 40%, font name 30%, alignment 30%
-    format_score = 0.4 * font_size_score + 0.3 * font_name_score + 0.3 * alignment_score
-
-    consolidated_score = 0.4 * font_size_score + 0.3 * font_name_score + 0.3 * alignment_score
-    return round(consolidated_score, 2)
+    return compute_format_stats(font_sizes, font_names, x_positions)["format_score"]
 
 # if __name__ == "__main__":
 #     pdf_path = input("Enter full PDF path: ").strip()
@@ -0,0 +1,78 @@
+import asyncio
+from typing import List
+
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+
+from models.schemas import CandidateRankRequest, CandidateSearchRequest
+from services.batch_screening import analyze_document_in_pool
+from services.bm25_index import aget_tenant_index
+from services.candidate_pool import add_to_pool, remove_from_pool, search_pool
+from services.document_cache import fingerprint
+from services.quota import require_b2b_licence
+
+router = APIRouter()
+
+
+@router.post("/resumes")
+async def add_resumes(email: str, resumes: List[UploadFile] = File(...), _licensed: str = Depends(require_b2b_licence)):
+    """Parse resumes and add them to the tenant's candidate pool (re-uploads are skipped)."""
+    index = await aget_tenant_index(email)
+    skipped, errors = [], []
+
+    pending = {}
+    for resume in resumes:
+        pdf_bytes = await resume.read()
+        resume_id = fingerprint(pdf_bytes)
+        if resume_id in index or resume_id in pending:
+            skipped.append({"resume_id": resume_id, "resume_name": resume.filename})
+        else:
+            pending[resume_id] = (resume.filename, pdf_bytes)
+
+    parsed = await asyncio.gather(
+        *(analyze_document_in_pool(pdf_bytes) for _, pdf_bytes in pending.values()),
+        return_exceptions=True,
+    )
+
+    items = []
+    for (resume_id, (resume_name, _)), document in zip(pending.items(), parsed):
+        if isinstance(document, Exception):
+            errors.append({"resume_name": resume_name, "error": str(document)})
+        else:
+            items.append((resume_id, resume_name, document["visible_text"]))
+
+    added = await add_to_pool(email, items)
+
+    return {
+        "added": [{"resume_id": resume_id, "resume_name": resume_name} for resume_id, resume_name, _ in added],
+        "skipped": skipped,
+        "errors": errors,
+        "pool_size": len(index),
+    }
+
+
+@router.delete("/resumes/{resume_id}")
+async def delete_resume(email: str, resume_id: str, _licensed: str = Depends(require_b2b_licence)):
+    if not await remove_from_pool(email, resume_id):
+        raise HTTPException(status_code=404, detail="Resume not found in the candidate pool")
+    return {"message": f"Removed {resume_id} from the candidate pool"}
+
+
+@router.post("/rank")
+async def rank_candidates(email: str, data: CandidateRankRequest, _licensed: str = Depends(require_b2b_licence)):
+    """BM25 ranking of the tenant's whole candidate pool against a JD."""
+    if data.top_k < 1:
+        raise HTTPException(status_code=400, detail="top_k must be at least 1")
+
+    index = await aget_tenant_index(email)
+    results = await asyncio.to_thread(index.rank, data.job_description, data.top_k)
+    return {"pool_size": len(index), "results": results}
+
+
+@router.post("/search")
+async def search_candidates(email: str, data: CandidateSearchRequest, _licensed: str = Depends(require_b2b_licence)):
+    """Semantic (embedding) nearest-neighbour search of the candidate pool by JD."""
+    if data.top_k < 1:
+        raise HTTPException(status_code=400, detail="top_k must be at least 1")
+
+    results = await search_pool(email, data.job_description, data.top_k, data.include_text)
+    return {"results": results}
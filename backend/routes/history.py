@@ -0,0 +1,22 @@
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException
+
+from services import analysis_store
+
+router = APIRouter()
+
+
+@router.get("")
+async def analysis_history(email: str, limit: int = analysis_store.HISTORY_PAGE_SIZE, cursor: Optional[str] = None, kind: Optional[str] = None):
+    """
+    The user's past analyses, newest first. Pass the returned next_cursor to
+    get the following page; kind filters to "skill_gap" (/analyze) or
+    "screening" (/analyze-resumes).
+    """
+    if not 1 <= limit <= analysis_store.HISTORY_MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {analysis_store.HISTORY_MAX_PAGE_SIZE}")
+    try:
+        return await analysis_store.history(email, limit=limit, cursor=cursor, kind=kind)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
@@ -0,0 +1,51 @@
+from fastapi import APIRouter
+
+from services import document_cache, llm_cache
+from services.embedding_batcher import get_embedding_batcher_stats
+from services.llm_gateway import get_single_flight_stats
+from services.mail_queue import get_mail_queue_stats
+from services.near_duplicate import get_jd_dedup_stats
+from services.pdf_visibility import get_tier_stats
+from services.quota import get_status_cache_stats
+
+router = APIRouter()
+
+
+@router.get("/hidden-text")
+def hidden_text_metrics():
+    return get_tier_stats()
+
+
+@router.get("/llm-cache")
+def llm_cache_metrics():
+    return llm_cache.get_stats()
+
+
+@router.get("/llm-single-flight")
+def llm_single_flight_metrics():
+    return get_single_flight_stats()
+
+
+@router.get("/user-status-cache")
+def user_status_cache_metrics():
+    return get_status_cache_stats()
+
+
+@router.get("/mail-queue")
+def mail_queue_metrics():
+    return get_mail_queue_stats()
+
+
+@router.get("/embedding-batcher")
+def embedding_batcher_metrics():
+    return get_embedding_batcher_stats()
+
+
+@router.get("/document-cache")
+def document_cache_metrics():
+    return document_cache.get_stats()
+
+
+@router.get("/jd-dedup")
+def jd_dedup_metrics():
+    return get_jd_dedup_stats()
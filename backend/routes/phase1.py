@@ -1,32 +1,13 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends
 from models.schemas import RoleRequest
 from services.ai_service import generate_response
-from db import auth_collection
+from services.quota import QuotaReservation, require_quota
 import json
 
 router = APIRouter()
 
 @router.post("/role-roadmap")
-def role_roadmap(email: str, data: RoleRequest):
-    # 1. Check user status
-    user = auth_collection.find_one({"email": email})
-    
-    if not user:
-        # If user doesn't exist, create them with 0 count
-        auth_collection.update_one(
-            {"email": email},
-            {"$setOnInsert": {"email": email, "freemium_count": 0, "ispremium": False}},
-            upsert=True
-        )
-        user = {"freemium_count": 0, "ispremium": False}
-
-    # 2. Check if limit reached
-    # Limit is set to 3 for free users
-    if not user.get("ispremium", False) and user.get("freemium_count", 0) >= 99:
-        raise HTTPException(
-            status_code=403, 
-            detail="Free limit reached (3/3). Please upgrade to Premium for unlimited access."
-        )
+async def role_roadmap(email: str, data: RoleRequest, bypass_cache: bool = False, quota: QuotaReservation = Depends(require_quota)):
 
     prompt = f"""
     For the role: {data.role}
@@ -42,17 +23,11 @@ def role_roadmap(email: str, data: RoleRequest):
     Do not add any extra text outside JSON.
     """
 
-    result = generate_response(prompt)
+    result = await generate_response(prompt, cache_name="role_roadmap", bypass_cache=bypass_cache)
 
     try:
         parsed_result = json.loads(result)
-        
-        # 3. Increment count only on success
-        auth_collection.update_one(
-            {"email": email},
-            {"$inc": {"freemium_count": 1}}
-        )
-        
         return parsed_result
     except:
+        await quota.refund()
         return {"error": "AI response not in valid JSON format", "raw": result}
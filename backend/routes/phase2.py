@@ -1,36 +1,16 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from models.schemas import JDRequest
 from services.ai_service import generate_response
+from services.near_duplicate import canonical_jd
 import json
-from db import auth_collection
+from services.quota import QuotaReservation, require_quota
 router = APIRouter()
 
-@router.post("/analyze-jd")
-def analyze_jd(email:str, data: JDRequest):
-
-    user = auth_collection.find_one({"email": email})
-    
-    if not user:
-        # If user doesn't exist, create them with 0 count
-        auth_collection.update_one(
-            {"email": email},
-            {"$setOnInsert": {"email": email, "freemium_count": 0, "ispremium": False}},
-            upsert=True
-        )
-        user = {"freemium_count": 0, "ispremium": False}
-
-    # 2. Check if limit reached
-    # Limit is set to 3 for free users
-    if not user.get("ispremium", False) and user.get("freemium_count", 0) >= 99:
-        raise HTTPException(
-            status_code=403, 
-            detail="Free limit reached (3/3). Please upgrade to Premium for unlimited access."
-        )
-
-    prompt = f"""
+def jd_prompt(job_description):
+    return f"""
     Analyze the following job description:
 
-    {data.job_description}
+    {job_description}
 
     Return STRICTLY in JSON format:
 
@@ -65,14 +45,20 @@ def analyze_jd(email:str, data: JDRequest):
     Do not include any text outside JSON.
     """
 
-    result = generate_response(prompt)
+
+@router.post("/analyze-jd")
+async def analyze_jd(email:str, data: JDRequest, bypass_cache: bool = False, quota: QuotaReservation = Depends(require_quota)):
+
+    # A near-duplicate of one of this user's earlier JDs is cached under the
+    # earlier JD's prompt, so it hits that analysis; the LLM always gets this JD
+    prompt = jd_prompt(data.job_description)
+    cache_key = None if bypass_cache else jd_prompt(canonical_jd(data.job_description, email))
+
+    result = await generate_response(prompt, cache_name="analyze_jd", bypass_cache=bypass_cache, cache_key=cache_key)
 
     try:
         parsed_result = json.loads(result)
-        auth_collection.update_one(
-            {"email": email},
-            {"$inc": {"freemium_count": 1}}
-        )
         return parsed_result
     except:
+        await quota.refund()
         return {"error": "AI response not valid JSON", "raw": result}
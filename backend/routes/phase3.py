@@ -1,32 +1,12 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends
 from models.schemas import CompanyRoleRequest
 from services.ai_service import generate_response
 import json
-from db import auth_collection
+from services.quota import QuotaReservation, require_quota
 router = APIRouter()
 
 @router.post("/company-role-analysis")
-def company_role_analysis(email: str,data: CompanyRoleRequest):
-
-
-    user = auth_collection.find_one({"email": email})
-    
-    if not user:
-        # If user doesn't exist, create them with 0 count
-        auth_collection.update_one(
-            {"email": email},
-            {"$setOnInsert": {"email": email, "freemium_count": 0, "ispremium": False}},
-            upsert=True
-        )
-        user = {"freemium_count": 0, "ispremium": False}
-
-    # 2. Check if limit reached
-    # Limit is set to 3 for free users
-    if not user.get("ispremium", False) and user.get("freemium_count", 0) >= 99:
-        raise HTTPException(
-            status_code=403, 
-            detail="Free limit reached (3/3). Please upgrade to Premium for unlimited access."
-        )
+async def company_role_analysis(email: str,data: CompanyRoleRequest, bypass_cache: bool = False, quota: QuotaReservation = Depends(require_quota)):
 
     prompt = f"""
     Provide detailed preparation guidance for the role 
@@ -53,14 +33,11 @@ def company_role_analysis(email: str,data: CompanyRoleRequest):
     Do not include any extra text outside JSON.
     """
 
-    result = generate_response(prompt)
+    result = await generate_response(prompt, cache_name="company_role_analysis", bypass_cache=bypass_cache)
 
     try:
         parsed_result = json.loads(result)
-        auth_collection.update_one(
-            {"email": email},
-            {"$inc": {"freemium_count": 1}}
-        )        
         return parsed_result
     except:
+        await quota.refund()
         return {"error": "AI response not valid JSON", "raw": result}
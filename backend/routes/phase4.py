@@ -1,31 +1,13 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends
 from models.schemas import CareerSwitchRequest
 from services.ai_service import generate_response
 import json
-from db import auth_collection
+from services.quota import QuotaReservation, require_quota
 router = APIRouter()
 
 @router.post("/career-switch")
-def career_switch(email:str, data: CareerSwitchRequest):
+async def career_switch(email:str, data: CareerSwitchRequest, bypass_cache: bool = False, quota: QuotaReservation = Depends(require_quota)):
 
-    user = auth_collection.find_one({"email": email})
-    
-    if not user:
-        # If user doesn't exist, create them with 0 count
-        auth_collection.update_one(
-            {"email": email},
-            {"$setOnInsert": {"email": email, "freemium_count": 0, "ispremium": False}},
-            upsert=True
-        )
-        user = {"freemium_count": 0, "ispremium": False}
-
-    # 2. Check if limit reached
-    # Limit is set to 3 for free users
-    if not user.get("ispremium", False) and user.get("freemium_count", 0) >= 99:
-        raise HTTPException(
-            status_code=403, 
-            detail="Free limit reached (3/3). Please upgrade to Premium for unlimited access."
-        )
         
     prompt = f"""
     A person currently working as '{data.current_role}' 
@@ -56,14 +38,11 @@ def career_switch(email:str, data: CareerSwitchRequest):
     Do not include any text outside JSON.
     """
 
-    result = generate_response(prompt)
+    result = await generate_response(prompt, cache_name="career_switch", bypass_cache=bypass_cache)
 
     try:
         parsed_result = json.loads(result)
-        auth_collection.update_one(
-            {"email": email},
-            {"$inc": {"freemium_count": 1}}
-        )        
         return parsed_result
     except:
+        await quota.refund()
         return {"error": "AI response not valid JSON", "raw": result}
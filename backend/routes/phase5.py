@@ -1,3 +1,4 @@
+import asyncio
 import json
 import re
 
@@ -40,7 +41,7 @@ async def start_interview(
 
 
     file_bytes = await resume_file.read()
-    resume_text = extract_text_from_pdf(file_bytes)
+    resume_text = await asyncio.to_thread(extract_text_from_pdf, file_bytes)
 
     session_id = create_session(resume_text, role, duration)
 
@@ -56,13 +57,13 @@ async def start_interview(
     Only return the question.
     """
 
-    question = generate_ai_response(prompt)
+    question = await generate_ai_response(prompt)
 
     return {"session_id": session_id, "question": question}
 
 
 @router.post("/next")
-def next_question(data: AnswerRequest):
+async def next_question(data: AnswerRequest):
     session = get_session(data.session_id)
 
     if not session:
@@ -96,13 +97,13 @@ def next_question(data: AnswerRequest):
     Return only the question.
     """
 
-    question = generate_ai_response(prompt)
+    question = await generate_ai_response(prompt)
 
     return {"question": question}
 
 
 @router.post("/final")
-def final_report(data: FinalReportRequest):
+async def final_report(data: FinalReportRequest):
     session = get_session(data.session_id)
 
     if not session:
@@ -133,7 +134,7 @@ def final_report(data: FinalReportRequest):
     }}
     """
 
-    result = generate_ai_response(prompt)
+    result = await generate_ai_response(prompt)
 
     parsed = _parse_ai_json_response(result)
     if parsed is not None:
@@ -0,0 +1,166 @@
+"""
+Check the background mail queue against a local SMTP stand-in.
+
+Starts a minimal SMTP server on 127.0.0.1 (no real account or network
+needed), points services/mail_queue.py at it and checks that:
+  - mail queued for the same recipient in one batch is sent once, latest wins
+  - a batch goes out over a single SMTP connection
+  - a transient 4xx rejection is retried on a new connection and delivered
+
+Usage (from backend/):
+    python scripts/check_mail_queue.py
+"""
+import os
+import socketserver
+import sys
+import threading
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+class StandInServer(socketserver.ThreadingTCPServer):
+    """Accepts every message; fail_data > 0 makes that many DATA commands fail with 451."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), SMTPHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.messages = []  # (recipients, message text)
+        self.rejected = 0
+        self.fail_data = 0
+
+    def reset(self):
+        with self.lock:
+            self.connections = 0
+            self.messages = []
+            self.rejected = 0
+            self.fail_data = 0
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self.reply("220 stand-in ESMTP")
+        recipients = []
+
+        for raw in self.rfile:
+            command = raw.decode(errors="replace").strip()
+            verb = command[:4].upper()
+            if verb in ("EHLO", "HELO"):
+                self.reply("250 stand-in")
+            elif verb == "MAIL":
+                recipients = []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                recipients.append(command.split(":", 1)[1].strip().strip("<>"))
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                for data in self.rfile:
+                    if data in (b".\r\n", b".\n"):
+                        break
+                    lines.append(data.decode(errors="replace"))
+                with server.lock:
+                    if server.fail_data > 0:
+                        server.fail_data -= 1
+                        server.rejected += 1
+                        transient = True
+                    else:
+                        server.messages.append((recipients, "".join(lines)))
+                        transient = False
+                self.reply("451 4.3.0 Try again later" if transient else "250 OK queued")
+            elif verb in ("RSET", "NOOP"):
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+def mail(address, skill):
+    return {"mail": address, "skills_missing": [skill], "improvement_suggestions": ["Add metrics"]}
+
+
+def check(results, label, ok):
+    results.append(ok)
+    print(f"{'✅' if ok else '❌'} {label}")
+
+
+def main():
+    server = StandInServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    # sendMail and mail_queue read their settings at import time
+    os.environ.update({
+        "SMTP_HOST": "127.0.0.1",
+        "SMTP_PORT": str(server.server_address[1]),
+        "SMTP_STARTTLS": "0",
+        "EMAIL_USER": "",
+        "EMAIL_PASS": "",
+        "MAIL_BATCH_SIZE": "50",
+        "MAIL_BATCH_WAIT_SECONDS": "0.5",
+        "MAIL_MAX_RETRIES": "2",
+        "MAIL_BACKOFF_BASE_SECONDS": "0.05",
+    })
+    from services.mail_queue import MailQueue
+
+    results = []
+
+    # Five entries for three recipients, queued within one batch window
+    queue = MailQueue()
+    queue.start()
+    for user in (
+        mail("a@example.com", "skill-a1"),
+        mail("b@example.com", "skill-b1"),
+        mail(" A@Example.com ", "skill-a2"),
+        mail("c@example.com", "skill-c1"),
+        mail("b@example.com", "skill-b2"),
+    ):
+        queue.enqueue(user)
+    queue.stop()
+    stats = queue.stats()
+
+    bodies = {recipients[0].strip().lower(): text for recipients, text in server.messages}
+    check(results, f"deduplication: 5 queued, {len(server.messages)} delivered, "
+                   f"{stats['deduplicated']} dropped as duplicates",
+          len(server.messages) == 3 and stats["deduplicated"] == 2 and stats["sent"] == 3)
+    check(results, "latest entry per recipient wins",
+          "skill-a2" in bodies.get("a@example.com", "") and "skill-b2" in bodies.get("b@example.com", ""))
+    check(results, f"batching: {stats['batches']} batch over {server.connections} SMTP connection(s)",
+          stats["batches"] == 1 and server.connections == 1 and stats["connections"] == 1)
+
+    # The first DATA is rejected with a 4xx; the queue reconnects and resends
+    server.reset()
+    server.fail_data = 1
+    queue = MailQueue()
+    queue.start()
+    queue.enqueue(mail("d@example.com", "skill-d"))
+    queue.enqueue(mail("e@example.com", "skill-e"))
+    queue.stop()
+    stats = queue.stats()
+
+    delivered = sorted(recipients[0] for recipients, _ in server.messages)
+    check(results, f"transient retry: {server.rejected} rejected with 451, delivered {delivered}, "
+                   f"{stats['failed']} failed, {server.connections} connection(s)",
+          server.rejected == 1 and delivered == ["d@example.com", "e@example.com"]
+          and stats["failed"] == 0 and server.connections == 2)
+
+    server.shutdown()
+    server.server_close()
+    if not all(results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Convert GloVe vectors once into gensim's native KeyedVectors format.
+
+The .kv file keeps the vectors in a separate .npy array, which the app opens
+memory-mapped and read-only (see GLOVE_KV_PATH in services/model_registry.py).
+Every worker then shares one copy through the page cache and startup needs
+no network.
+
+Usage (from backend/):
+    python scripts/convert_glove.py                      # download via gensim-data
+    python scripts/convert_glove.py --text glove.6B.100d.txt
+    python scripts/convert_glove.py --out /srv/vectors/glove.kv
+"""
+import argparse
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from services.model_registry import GLOVE_KV_PATH, GLOVE_MODEL_NAME
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--text", help="GloVe .txt file (no header) to convert instead of downloading")
+    parser.add_argument("--name", default=GLOVE_MODEL_NAME, help="gensim-data model to download")
+    parser.add_argument("--out", default=GLOVE_KV_PATH)
+    args = parser.parse_args()
+
+    from gensim.models import KeyedVectors
+
+    started = time.perf_counter()
+    if args.text:
+        vectors = KeyedVectors.load_word2vec_format(args.text, binary=False, no_header=True)
+    else:
+        import gensim.downloader as api
+
+        vectors = api.load(args.name)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    # sep_limit=0 always stores the vector array as its own .npy so it can be mmapped
+    vectors.save(args.out, sep_limit=0)
+
+    print(f"✅ Saved {len(vectors.index_to_key):,} x {vectors.vector_size} vectors to {args.out} "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Export the sentence-transformers model to ONNX, plus an int8-quantized copy.
+
+Writes to EMBEDDING_ONNX_DIR (default data/<model>-onnx):
+  model.onnx           fp32 transformer, dynamic batch and sequence axes
+  model_int8.onnx      dynamically quantized weights (onnxruntime)
+  tokenizer.json       fast tokenizer used by services/onnx_encoder.py
+  encoder_config.json  max_seq_length, pooling and normalization
+
+Pooling and normalization run in numpy, so the graph only holds the
+transformer. Select the result with EMBEDDING_BACKEND=onnx or onnx-int8 and
+check it with benchmarks/bench_embedding_backends.py.
+
+Usage (from backend/, needs sentence-transformers, torch and onnxruntime):
+    python scripts/export_onnx.py [--model all-MiniLM-L6-v2] [--out DIR]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from services.model_registry import EMBEDDING_ONNX_DIR, SENTENCE_MODEL_NAME
+from services.onnx_encoder import ONNX_MODEL_FILES
+
+INPUT_NAMES = ["input_ids", "attention_mask", "token_type_ids"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=SENTENCE_MODEL_NAME)
+    parser.add_argument("--out", default=EMBEDDING_ONNX_DIR)
+    parser.add_argument("--opset", type=int, default=14)
+    args = parser.parse_args()
+
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from sentence_transformers import SentenceTransformer
+    from sentence_transformers.models import Normalize, Pooling
+
+    started = time.perf_counter()
+    model = SentenceTransformer(args.model, device="cpu")
+    transformer = model[0].auto_model.eval()
+    tokenizer = model.tokenizer
+
+    pooling = next(module for module in model if isinstance(module, Pooling))
+    if not pooling.pooling_mode_mean_tokens:
+        sys.exit(f"{args.model} does not use mean pooling; the ONNX encoder only supports mean pooling")
+
+    class TokenEmbeddings(torch.nn.Module):
+        """The transformer's last hidden state, without the ModelOutput wrapper."""
+
+        def __init__(self, inner):
+            super().__init__()
+            self.inner = inner
+
+        def forward(self, input_ids, attention_mask, token_type_ids):
+            return self.inner(
+                input_ids=input_ids, attention_mask=attention_mask, token_type_ids=token_type_ids
+            )[0]
+
+    os.makedirs(args.out, exist_ok=True)
+    fp32_path = os.path.join(args.out, ONNX_MODEL_FILES["onnx"])
+    sample = tokenizer(["an example resume line", "a job description"], padding=True, return_tensors="pt")
+
+    with torch.no_grad():
+        torch.onnx.export(
+            TokenEmbeddings(transformer),
+            tuple(sample[name] for name in INPUT_NAMES),
+            fp32_path,
+            input_names=INPUT_NAMES,
+            output_names=["token_embeddings"],
+            dynamic_axes={name: {0: "batch", 1: "sequence"} for name in INPUT_NAMES + ["token_embeddings"]},
+            opset_version=args.opset,
+        )
+
+    quantize_dynamic(fp32_path, os.path.join(args.out, ONNX_MODEL_FILES["onnx-int8"]), weight_type=QuantType.QInt8)
+
+    tokenizer.save_pretrained(args.out)
+    with open(os.path.join(args.out, "encoder_config.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "model": args.model,
+            "max_seq_length": model.max_seq_length,
+            "pooling": "mean",
+            "normalize": any(isinstance(module, Normalize) for module in model),
+            "pad_token": tokenizer.pad_token,
+            "pad_token_id": tokenizer.pad_token_id,
+        }, f, indent=2)
+
+    print(f"✅ Exported {args.model} to {args.out} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
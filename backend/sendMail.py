@@ -9,30 +9,44 @@ load_dotenv()
 EMAIL_USER = os.getenv("EMAIL_USER")
 EMAIL_PASS = os.getenv("EMAIL_PASS")
 
+# Point these at a local stand-in (e.g. `python -m smtpd -n -c DebuggingServer
+# localhost:1025` with SMTP_STARTTLS=0) to try mail without a real account;
+# scripts/check_mail_queue.py runs the mail queue against its own stand-in.
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "1") == "1"
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT_SECONDS", "10"))
 
-def send_mail(filtered_results):
-    if not filtered_results:
-        print("No users to send mail.")
-        return
+SUBJECT = "Resume Analysis - Improvement Suggestions"
 
-    server = None
+
+def open_smtp_connection():
+    """Connect, upgrade to TLS and log in; the caller owns the returned server."""
+    server = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=SMTP_TIMEOUT)
     try:
-        server = smtplib.SMTP("smtp.gmail.com", 587, timeout=10)
-        server.starttls()
-        server.login(EMAIL_USER, EMAIL_PASS)
-    except Exception as e:
-        print(f"Failed to connect or login to SMTP server: {e}")
-        return
+        if SMTP_STARTTLS:
+            server.starttls()
+        if EMAIL_USER and EMAIL_PASS:
+            server.login(EMAIL_USER, EMAIL_PASS)
+    except Exception:
+        server.close()
+        raise
+    return server
+
 
+def close_smtp_connection(server):
     try:
-        for user in filtered_results:
-            receiver_email = user["mail"]
-            missing_skills = ", ".join(user["skills_missing"])
-            improvements = "\n".join(user["improvement_suggestions"])
+        server.quit()
+    except Exception:
+        server.close()
 
-            subject = "Resume Analysis - Improvement Suggestions"
 
-            body = f"""
+def build_message(user):
+    """MIME message with the improvement suggestions for one screened candidate."""
+    missing_skills = ", ".join(user["skills_missing"])
+    improvements = "\n".join(user["improvement_suggestions"])
+
+    body = f"""
 Hello,
 
 Your resume needs improvement based on our analysis.
@@ -49,20 +63,33 @@ Best Regards,
 Resume Analyzer Team
 """
 
-            msg = MIMEMultipart()
-            msg["From"] = EMAIL_USER
-            msg["To"] = receiver_email
-            msg["Subject"] = subject
-            msg.attach(MIMEText(body, "plain"))
+    msg = MIMEMultipart()
+    msg["From"] = EMAIL_USER or ""
+    msg["To"] = user["mail"]
+    msg["Subject"] = SUBJECT
+    msg.attach(MIMEText(body, "plain"))
+    return msg
+
 
+def send_mail(filtered_results):
+    """Send every message over one connection, blocking until done (the app uses services.mail_queue)."""
+    if not filtered_results:
+        print("No users to send mail.")
+        return
+
+    try:
+        server = open_smtp_connection()
+    except Exception as e:
+        print(f"Failed to connect or login to SMTP server: {e}")
+        return
+
+    try:
+        for user in filtered_results:
+            receiver_email = user["mail"]
             try:
-                server.sendmail(EMAIL_USER, receiver_email, msg.as_string())
+                server.sendmail(EMAIL_USER, receiver_email, build_message(user).as_string())
                 print(f"Mail sent to {receiver_email}")
             except Exception as e:
                 print(f"Failed to send mail to {receiver_email}: {e}")
     finally:
-        if server:
-            try:
-                server.quit()
-            except:
-                pass
+        close_smtp_connection(server)
@@ -1,27 +1,23 @@
-import os
-from openai import OpenAI
-from dotenv import load_dotenv
+from services.llm_gateway import CAREER_ADVISOR_PROMPT, generate, generate_sync
 
-load_dotenv()
 
-client = OpenAI(
-    api_key=os.getenv("OPENROUTER_API_KEY_B"),
-    base_url="https://openrouter.ai/api/v1"
-)
+async def generate_response(prompt: str, cache_name=None, bypass_cache=False, cache_key=None):
+    result = await generate(
+        prompt,
+        system_prompt=CAREER_ADVISOR_PROMPT,
+        cache_name=cache_name,
+        bypass_cache=bypass_cache,
+        cache_key=cache_key,
+    )
+    return result.text
 
-def generate_response(prompt: str):
-    try:
-        response = client.chat.completions.create(
-            model="openai/gpt-4o-mini",   # safe default model
-            messages=[
-                {"role": "system", "content": "You are an expert career advisor and resume expert."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=1000
-        )
 
-        return response.choices[0].message.content
-
-    except Exception as e:
-        return f"Error: {str(e)}"
+def generate_response_sync(prompt: str, cache_name=None, bypass_cache=False, cache_key=None):
+    result = generate_sync(
+        prompt,
+        system_prompt=CAREER_ADVISOR_PROMPT,
+        cache_name=cache_name,
+        bypass_cache=bypass_cache,
+        cache_key=cache_key,
+    )
+    return result.text
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from dotenv import load_dotenv
+
+from db import get_db
+from services.llm_gateway import DEFAULT_MODEL
+from services.llm_cache import normalize_prompt
+
+load_dotenv()
+
+ANALYSIS_STORE_ENABLED = os.getenv("ANALYSIS_STORE_ENABLED", "1") == "1"
+ANALYSES_COLLECTION = "analyses"
+
+HISTORY_PAGE_SIZE = 20
+HISTORY_MAX_PAGE_SIZE = 100
+
+# Everything history needs to show an entry, without the store key
+HISTORY_PROJECTION = {
+    "kind": 1, "resume_name": 1, "target": 1, "result": 1, "created_at": 1, "updated_at": 1,
+}
+
+
+def analysis_key(kind, resume_hash, target, prompt_version):
+    """
+    Store key for one analysis: the resume's content hash, the JD/role it was
+    compared with (whitespace-normalized), the prompt version and the model.
+    """
+    payload = json.dumps(
+        {
+            "kind": kind,
+            "resume": resume_hash,
+            "target": {name: normalize_prompt(value or "") for name, value in target.items()},
+            "prompt_version": prompt_version,
+            "model": DEFAULT_MODEL,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _collection():
+    return get_db()[ANALYSES_COLLECTION]
+
+
+async def find(key):
+    """A stored result for the key (from any user), or None."""
+    if not ANALYSIS_STORE_ENABLED:
+        return None
+    try:
+        doc = await _collection().find_one({"key": key}, {"result": 1})
+    except Exception as exc:
+        print(f"Analysis store read failed: {exc}")
+        return None
+    return doc["result"] if doc else None
+
+
+async def record(email, key, kind, resume_name, target, result):
+    """
+    Save a result and add it to the user's history. Repeating an analysis
+    refreshes the user's existing entry instead of adding another.
+    """
+    if not ANALYSIS_STORE_ENABLED:
+        return
+    now = datetime.now(timezone.utc)
+    try:
+        await _collection().update_one(
+            {"key": key, "email": email},
+            {
+                "$set": {"result": result, "resume_name": resume_name, "updated_at": now},
+                "$setOnInsert": {
+                    "kind": kind,
+                    "target": {name: value for name, value in target.items() if value},
+                    "created_at": now,
+                },
+            },
+            upsert=True,
+        )
+    except Exception as exc:
+        print(f"Analysis store write failed: {exc}")
+
+
+def parse_cursor(cursor):
+    """ObjectId from a history cursor; ValueError if it is not one."""
+    try:
+        return ObjectId(cursor)
+    except (InvalidId, TypeError):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+
+
+async def history(email, limit=HISTORY_PAGE_SIZE, cursor=None, kind=None):
+    """
+    One page of the user's analyses, newest first, and the cursor for the
+    next page (None on the last). Pages are keyed on _id rather than skipped,
+    so deep pages cost the same as the first.
+    """
+    query = {"email": email}
+    if cursor:
+        query["_id"] = {"$lt": parse_cursor(cursor)}
+    if kind:
+        query["kind"] = kind
+
+    docs = await _collection().find(query, HISTORY_PROJECTION).sort("_id", -1).limit(limit + 1).to_list()
+    has_more = len(docs) > limit
+    docs = docs[:limit]
+    for doc in docs:
+        doc["id"] = str(doc.pop("_id"))
+    return {"items": docs, "next_cursor": docs[-1]["id"] if has_more else None}
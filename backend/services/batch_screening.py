@@ -0,0 +1,304 @@
+import asyncio
+import os
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from dotenv import load_dotenv
+
+from resume_screening import SCREENING_PROMPT_VERSION, analyze_resume_with_ai
+from services import analysis_store, document_cache
+from services.candidate_pool import add_to_pool_later
+from services.document_analysis import analyze_document
+from services.near_duplicate import RESUME_DEDUP_ENABLED, RESUME_DEDUP_THRESHOLD, group_near_duplicates
+from services.pdf_visibility import record_tier_stats
+from services.single_flight import SingleFlight
+
+load_dotenv()
+
+# PDF parsing and raster work is CPU-bound, so it runs in worker processes;
+# LLM calls are async I/O and only need a cap on how many are in flight,
+# shared by every batch this process is screening.
+PDF_WORKERS = int(os.getenv("SCREENING_PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+LLM_CONCURRENCY = int(os.getenv("SCREENING_LLM_CONCURRENCY", "8"))
+
+_pdf_executor = None
+_parses = SingleFlight()
+_llm_slots = None  # (event loop, Semaphore(LLM_CONCURRENCY))
+
+
+def _process_llm_slots():
+    """The process-wide LLM limiter, created for the running event loop."""
+    global _llm_slots
+    loop = asyncio.get_running_loop()
+    if _llm_slots is None or _llm_slots[0] is not loop:
+        _llm_slots = (loop, asyncio.Semaphore(LLM_CONCURRENCY))
+    return _llm_slots[1]
+
+
+def get_pdf_executor():
+    global _pdf_executor
+    if _pdf_executor is None:
+        _pdf_executor = ProcessPoolExecutor(max_workers=PDF_WORKERS)
+    return _pdf_executor
+
+
+def shutdown_pdf_executor():
+    global _pdf_executor
+    if _pdf_executor is not None:
+        _pdf_executor.shutdown(wait=False, cancel_futures=True)
+        _pdf_executor = None
+
+
+def _replace_broken_executor(executor):
+    """Drop a broken pool, unless another request has already replaced it."""
+    global _pdf_executor
+    if _pdf_executor is executor:
+        _pdf_executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def _run_parse(executor, pdf_bytes):
+    """analyze_document on the executor, or None if its pool broke under it."""
+    try:
+        return await asyncio.get_running_loop().run_in_executor(executor, analyze_document, pdf_bytes)
+    except BrokenProcessPool:
+        return None
+    except asyncio.CancelledError:
+        # Our own task being cancelled propagates; a parse cancelled because
+        # a broken pool was shut down counts as the pool breaking.
+        if asyncio.current_task().cancelling():
+            raise
+        return None
+
+
+async def _parse_in_pool(key, pdf_bytes):
+    executor = get_pdf_executor()
+    document = await _run_parse(executor, pdf_bytes)
+    if document is None:
+        # A worker died (e.g. a malformed PDF crashed MuPDF) and took every
+        # parse on the pool with it. Start a fresh shared pool, and retry this
+        # PDF once in a pool of its own, so the one that keeps crashing fails
+        # alone instead of breaking the retries of the rest of the batch.
+        _replace_broken_executor(executor)
+        isolated = ProcessPoolExecutor(max_workers=1)
+        try:
+            document = await _run_parse(isolated, pdf_bytes)
+        finally:
+            isolated.shutdown(wait=False)
+        if document is None:
+            raise ValueError("PDF worker crashed while parsing this resume")
+
+    record_tier_stats(document.pop("tier_stats"))
+    await document_cache.astore(key, document, document.pop("parse_ms"))
+    return document
+
+
+async def analyze_document_in_pool(pdf_bytes, key=None):
+    """
+    analyze_document in a worker process. PDFs seen before (same bytes) come
+    from the document cache, and identical uploads parsed at the same time
+    share one parse. The result is shared, so treat it as read-only.
+
+    key is the PDF's fingerprint, for callers that already computed it.
+    """
+    key = key or document_cache.fingerprint(pdf_bytes)
+    document = await document_cache.alookup(key)
+    if document is not None:
+        return document
+    return await _parses.do(key, lambda: _parse_in_pool(key, pdf_bytes))
+
+
+async def _analysis(resume_name, resume_hash, document, job_text, job_key, llm_semaphore, email, bypass_cache):
+    """
+    Screening result for one parsed resume: the LLM analysis, or the stored
+    one (marked "cached": True) when the same resume was screened against the
+    same job key before. Stored hits skip the LLM and its low-score mail.
+    """
+    target = {"job_text": job_text}
+    key = analysis_store.analysis_key("screening", resume_hash, {"job_text": job_key}, SCREENING_PROMPT_VERSION)
+    if not bypass_cache:
+        stored = await analysis_store.find(key)
+        if stored is not None:
+            await analysis_store.record(email, key, "screening", resume_name, target, stored)
+            return {"resume_name": resume_name, "analysis": stored, "cached": True}
+
+    # The batch's own (lower) cap first, so a waiting batch holds no process slot
+    async with llm_semaphore, _process_llm_slots():
+        analysis = await analyze_resume_with_ai(document["visible_text"], job_text)
+    await analysis_store.record(email, key, "screening", resume_name, target, analysis)
+    return {"resume_name": resume_name, "analysis": analysis}
+
+
+async def screen_resume(resume_name, pdf_bytes, job_text, llm_semaphore, email=None, bypass_cache=False, job_key=None):
+    """Screen one resume; failures are reported in the result instead of raised."""
+    try:
+        resume_hash = document_cache.fingerprint(pdf_bytes)
+        document = await analyze_document_in_pool(pdf_bytes, resume_hash)
+        return await _analysis(
+            resume_name, resume_hash, document, job_text, job_key or job_text, llm_semaphore, email, bypass_cache
+        )
+
+    except Exception as exc:
+        print(f"Screening failed for {resume_name}: {exc}")
+        return {"resume_name": resume_name, "analysis": None, "error": str(exc)}
+
+
+async def _parse_resume(resume_name, pdf_bytes, resume_hash):
+    try:
+        return await analyze_document_in_pool(pdf_bytes, resume_hash), None
+    except Exception as exc:
+        print(f"Screening failed for {resume_name}: {exc}")
+        return None, {"resume_name": resume_name, "analysis": None, "error": str(exc)}
+
+
+async def _analyze_parsed(
+    resume_name, resume_hash, document, job_text, job_key, llm_semaphore, local_score, email, bypass_cache
+):
+    try:
+        result = await _analysis(resume_name, resume_hash, document, job_text, job_key, llm_semaphore, email, bypass_cache)
+    except Exception as exc:
+        print(f"Screening failed for {resume_name}: {exc}")
+        result = {"resume_name": resume_name, "analysis": None, "error": str(exc)}
+    if local_score is not None:
+        result["local_score"] = local_score
+    return result
+
+
+def local_scores(documents, job_text):
+    """Hybrid (semantic + GloVe + skill overlap) score of each document's visible text."""
+    # Imported here so the app starts without the scoring stack (sklearn, gensim)
+    from pdf_color_extractor import score_visible_texts_vs_job
+
+    texts = [document["visible_text"] for document in documents]
+    return [round(float(score), 2) for score in score_visible_texts_vs_job(texts, job_text)]
+
+
+def select_for_llm(scores, top_k=None, min_score=None):
+    """Indices of the scores that pass min_score and rank in the top_k (ties keep input order)."""
+    ranked = sorted(range(len(scores)), key=lambda i: -scores[i])
+    if min_score is not None:
+        ranked = [i for i in ranked if scores[i] >= min_score]
+    if top_k is not None:
+        ranked = ranked[:top_k]
+    return set(ranked)
+
+
+async def screen_resumes(
+    uploads,
+    job_text,
+    llm_concurrency=None,
+    prefilter_top_k=None,
+    prefilter_min_score=None,
+    tenant=None,
+    bypass_cache=False,
+    job_key=None,
+):
+    """
+    Screen (resume_name, pdf_bytes) pairs concurrently. LLM calls share the
+    process-wide SCREENING_LLM_CONCURRENCY limit with every other batch;
+    llm_concurrency can only lower it for this batch. Results come back in
+    input order.
+
+    With prefilter_top_k and/or prefilter_min_score, every resume is first
+    scored locally and only the top K / those at or above the score go to the
+    LLM; the others come back with "prefiltered": True and their local score.
+
+    Analyses are saved to the analysis store, and a resume screened against
+    the same job text before gets the stored analysis (marked "cached": True)
+    instead of an LLM call, unless bypass_cache is set. job_key, when given,
+    is the text stored analyses are keyed on in place of job_text (e.g. the
+    canonical near-duplicate JD); the LLM always gets job_text. With a tenant (the
+    caller's email) the results also go into that user's history, and every
+    parsed resume is added to their candidate pool in the background, after
+    the results are returned (see services/candidate_pool.py).
+
+    Near-duplicate resumes in the batch (renamed files, small edits) are
+    screened once: the first copy is analysed and lists the others under
+    "duplicates", and each other copy gets its result with "duplicate_of"
+    and "similarity" added.
+    """
+    if llm_concurrency and llm_concurrency < LLM_CONCURRENCY:
+        llm_semaphore = asyncio.Semaphore(llm_concurrency)
+    else:
+        llm_semaphore = nullcontext()
+    job_key = job_key or job_text
+
+    prefilter = prefilter_top_k is not None or prefilter_min_score is not None
+    if not prefilter and tenant is None and not RESUME_DEDUP_ENABLED:
+        return await asyncio.gather(*(
+            screen_resume(resume_name, pdf_bytes, job_text, llm_semaphore, bypass_cache=bypass_cache, job_key=job_key)
+            for resume_name, pdf_bytes in uploads
+        ))
+
+    hashes = [document_cache.fingerprint(pdf_bytes) for _, pdf_bytes in uploads]
+    parsed = await asyncio.gather(*(
+        _parse_resume(name, pdf_bytes, resume_hash) for (name, pdf_bytes), resume_hash in zip(uploads, hashes)
+    ))
+    results = [error for _, error in parsed]
+    ok = [i for i, (document, _) in enumerate(parsed) if document is not None]
+
+    # groups[k]: (position in ok of the copy that represents ok[k], similarity)
+    if RESUME_DEDUP_ENABLED:
+        groups = await asyncio.to_thread(
+            group_near_duplicates, [parsed[i][0]["visible_text"] for i in ok], RESUME_DEDUP_THRESHOLD
+        )
+    else:
+        groups = [(position, 1.0) for position in range(len(ok))]
+    screened = [i for position, i in enumerate(ok) if groups[position][0] == position]
+
+    scores = [None] * len(screened)
+    selected = set(range(len(screened)))
+    if prefilter:
+        try:
+            # Embedding and GloVe scoring block, so keep them off the event loop
+            scores = await asyncio.to_thread(local_scores, [parsed[i][0] for i in screened], job_text)
+        except Exception as exc:
+            # Without local scores there is nothing to rank by; screen everything
+            print(f"Local pre-filter unavailable, sending every resume to the LLM: {exc}")
+            scores = [None] * len(screened)
+        else:
+            selected = select_for_llm(scores, prefilter_top_k, prefilter_min_score)
+
+    llm_calls = {}
+    for position, i in enumerate(screened):
+        resume_name = uploads[i][0]
+        if position in selected:
+            llm_calls[i] = _analyze_parsed(
+                resume_name, hashes[i], parsed[i][0], job_text, job_key, llm_semaphore, scores[position], tenant,
+                bypass_cache,
+            )
+        else:
+            results[i] = {
+                "resume_name": resume_name,
+                "analysis": None,
+                "prefiltered": True,
+                "local_score": scores[position],
+            }
+
+    for i, result in zip(llm_calls, await asyncio.gather(*llm_calls.values())):
+        results[i] = result
+
+    duplicates = {}
+    for position, i in enumerate(ok):
+        representative, similarity = groups[position]
+        if representative != position:
+            representative = ok[representative]
+            results[i] = {
+                **results[representative],
+                "resume_name": uploads[i][0],
+                "duplicate_of": uploads[representative][0],
+                "similarity": round(similarity, 3),
+            }
+            duplicates.setdefault(representative, []).append(uploads[i][0])
+    for representative, names in duplicates.items():
+        results[representative]["duplicates"] = names
+
+    if tenant is not None:
+        pool_items = [
+            (hashes[i], uploads[i][0], parsed[i][0]["visible_text"])
+            for i in ok
+        ]
+        # Embedding every resume for the pool would hold up the response
+        add_to_pool_later(tenant, pool_items)
+    return results
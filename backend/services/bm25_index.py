@@ -0,0 +1,268 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import uuid
+from array import array
+from collections import Counter
+
+import numpy as np
+from dotenv import load_dotenv
+
+from services.model_registry import DATA_DIR
+
+load_dotenv()
+
+BM25_INDEX_DIR = os.getenv("BM25_INDEX_DIR", os.path.join(DATA_DIR, "bm25"))
+
+# rank_bm25.BM25Okapi defaults, so scores match the library exactly
+K1 = 1.5
+B = 0.75
+EPSILON = 0.25
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+
+def tokenize(text):
+    """Lowercased word tokens; keeps skill names such as c++ and c#."""
+    return _TOKEN.findall(text.lower())
+
+
+class BM25Index:
+    """
+    Incremental Okapi BM25 over an inverted index.
+
+    Each term keeps parallel arrays of document numbers and term counts, so
+    adding a document only appends to the postings of its own terms, and a
+    query touches only the postings of the query terms. Scores follow
+    rank_bm25.BM25Okapi, including its epsilon floor for negative idf.
+
+    With a log_path every added document is appended to a JSON-lines log
+    that is replayed on load, so the index survives restarts without a
+    rebuild. Every worker process keeps its own index over the shared log,
+    and picks up the lines the others appended before ranking and before
+    each change. Deletes are tombstones: the document stops ranking but
+    still counts towards idf and average length.
+    """
+
+    def __init__(self, log_path=None):
+        self.log_path = log_path
+        self._lock = threading.RLock()
+        self._postings = {}  # term -> (array of doc numbers, array of counts)
+        self._doc_lens = array("I")
+        self._doc_ids = []
+        self._doc_names = []
+        self._doc_numbers = {}  # live doc id -> doc number
+        self._deleted = set()
+        self._total_len = 0
+        self._average_idf = None  # recomputed after the corpus changes
+        self._log_offset = 0  # bytes of the log already applied
+        # Tags this instance's log lines, so refresh() skips what it wrote itself
+        self._writer = uuid.uuid4().hex[:12]
+
+        if log_path and os.path.exists(log_path):
+            self._read_log()
+
+    def __len__(self):
+        return len(self._doc_numbers)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._doc_numbers
+
+    def _read_log(self):
+        """Apply the log from where the last read stopped."""
+        with open(self.log_path, "rb") as f:
+            f.seek(self._log_offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # another process is mid-write; read it next time
+                self._log_offset += len(raw)
+                line = raw.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A torn line from a crash mid-write; everything around it is intact
+                    print(f"Skipping unreadable line in {self.log_path}")
+                    continue
+                if entry.get("by") == self._writer:
+                    continue
+                if "delete" in entry:
+                    self._remove(entry["delete"])
+                elif entry["id"] not in self._doc_numbers:
+                    # Two workers can log the same upload; index it once
+                    self._insert(entry["id"], entry.get("name"), entry["tf"])
+
+    def refresh(self):
+        """Apply log lines appended by other processes since the last read."""
+        if not self.log_path:
+            return
+        with self._lock:
+            try:
+                size = os.path.getsize(self.log_path)
+            except FileNotFoundError:
+                return
+            if size > self._log_offset:
+                self._read_log()
+
+    def _insert(self, doc_id, name, term_counts):
+        doc_number = len(self._doc_ids)
+        self._doc_ids.append(doc_id)
+        self._doc_names.append(name)
+        self._doc_numbers[doc_id] = doc_number
+
+        doc_len = sum(term_counts.values())
+        self._doc_lens.append(doc_len)
+        self._total_len += doc_len
+
+        for term, count in term_counts.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = (array("I"), array("I"))
+            postings[0].append(doc_number)
+            postings[1].append(count)
+        self._average_idf = None
+
+    def _remove(self, doc_id):
+        doc_number = self._doc_numbers.pop(doc_id, None)
+        if doc_number is not None:
+            self._deleted.add(doc_number)
+        return doc_number is not None
+
+    def _append_log(self, entry):
+        if self.log_path:
+            os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({**entry, "by": self._writer}) + "\n")
+
+    def add(self, doc_id, text, name=None):
+        """Index one document; returns False if doc_id is already indexed."""
+        term_counts = Counter(tokenize(text))
+        with self._lock:
+            self.refresh()
+            if doc_id in self._doc_numbers:
+                return False
+            self._append_log({"id": doc_id, "name": name, "tf": term_counts})
+            self._insert(doc_id, name, term_counts)
+            return True
+
+    def delete(self, doc_id):
+        """Stop ranking doc_id; returns False if it is not indexed."""
+        with self._lock:
+            self.refresh()
+            if doc_id not in self._doc_numbers:
+                return False
+            self._append_log({"delete": doc_id})
+            return self._remove(doc_id)
+
+    def _idf(self, doc_freq):
+        n = len(self._doc_ids)
+        return np.log((n - doc_freq + 0.5) / (doc_freq + 0.5))
+
+    def _idf_floor(self):
+        if self._average_idf is None:
+            doc_freqs = np.fromiter((len(p[0]) for p in self._postings.values()), dtype=np.float64)
+            self._average_idf = float(self._idf(doc_freqs).mean()) if doc_freqs.size else 0.0
+        return EPSILON * self._average_idf
+
+    def get_scores(self, query):
+        """BM25 score of every indexed document, in insertion order."""
+        with self._lock:
+            n = len(self._doc_ids)
+            scores = np.zeros(n)
+            if n == 0:
+                return scores
+
+            doc_lens = np.frombuffer(self._doc_lens, dtype=np.uint32)
+            avgdl = self._total_len / n
+            idf_floor = self._idf_floor()
+
+            for term, repeats in Counter(tokenize(query)).items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    continue
+                doc_numbers = np.frombuffer(postings[0], dtype=np.uint32)
+                counts = np.frombuffer(postings[1], dtype=np.uint32).astype(np.float64)
+
+                idf = self._idf(len(doc_numbers))
+                if idf < 0:
+                    idf = idf_floor
+
+                lengths = doc_lens[doc_numbers]
+                term_scores = idf * counts * (K1 + 1) / (counts + K1 * (1 - B + B * lengths / avgdl))
+                scores += repeats * np.bincount(doc_numbers, weights=term_scores, minlength=n)
+            return scores
+
+    def rank(self, query, top_k=20):
+        """The top_k live documents for the query as [{"resume_id", "resume_name", "score"}]."""
+        with self._lock:
+            self.refresh()
+            scores = self.get_scores(query)
+            if self._deleted:
+                scores[list(self._deleted)] = -np.inf
+            top_k = min(top_k, len(self._doc_numbers))
+            if top_k == 0:
+                return []
+            top = np.argpartition(-scores, top_k - 1)[:top_k]
+            top = top[np.lexsort((top, -scores[top]))]  # best first, ties in insertion order
+            return [
+                {
+                    "resume_id": self._doc_ids[i],
+                    "resume_name": self._doc_names[i],
+                    "score": round(float(scores[i]), 4),
+                }
+                for i in top
+            ]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "documents": len(self._doc_numbers),
+                "deleted": len(self._deleted),
+                "terms": len(self._postings),
+                "postings": sum(len(p[0]) for p in self._postings.values()),
+                "average_length": round(self._total_len / len(self._doc_ids), 2) if self._doc_ids else 0.0,
+            }
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+_loading_locks = {}  # tenant -> lock held while that tenant's log is replayed
+
+
+def tenant_log_path(tenant):
+    # Hashed so any tenant key (e.g. an email) is a safe file name
+    return os.path.join(BM25_INDEX_DIR, hashlib.sha256(tenant.encode("utf-8")).hexdigest()[:32] + ".jsonl")
+
+
+def get_tenant_index(tenant):
+    """
+    The tenant's persistent index, loaded from its log on first use. Replaying
+    a large log takes seconds, so it holds only that tenant's lock.
+    """
+    with _indexes_lock:
+        index = _indexes.get(tenant)
+        if index is not None:
+            return index
+        loading_lock = _loading_locks.setdefault(tenant, threading.Lock())
+
+    with loading_lock:
+        with _indexes_lock:
+            index = _indexes.get(tenant)
+        if index is None:
+            index = BM25Index(tenant_log_path(tenant))
+            with _indexes_lock:
+                _indexes[tenant] = index
+                _loading_locks.pop(tenant, None)
+        return index
+
+
+async def aget_tenant_index(tenant):
+    """get_tenant_index off the event loop, for async handlers."""
+    index = _indexes.get(tenant)
+    if index is not None:
+        return index
+    return await asyncio.to_thread(get_tenant_index, tenant)
@@ -0,0 +1,96 @@
+import asyncio
+
+from services.bm25_index import get_tenant_index
+from services.vector_index import get_tenant_vector_index
+
+
+def _embed_texts(texts):
+    # Imported here so the app starts without the scoring stack (sklearn, gensim)
+    from pdf_color_extractor import embed_texts
+
+    return embed_texts(texts)
+
+
+def _add_blocking(tenant, items):
+    bm25 = get_tenant_index(tenant)
+    added = [item for item in items if bm25.add(item[0], item[2], name=item[1])]
+
+    vectors = get_tenant_vector_index(tenant)
+    missing = [item for item in items if item[0] not in vectors]
+    if missing:
+        try:
+            embeddings = _embed_texts([text for _, _, text in missing])
+        except Exception as exc:
+            # Keyword ranking still works; the vectors are added on a later upload
+            print(f"Vector index not updated for {len(missing)} resumes: {exc}")
+        else:
+            for (resume_id, resume_name, text), embedding in zip(missing, embeddings):
+                vectors.add(resume_id, embedding, name=resume_name, text=text)
+            # Clustering happens here, on the indexing path, never inside a search
+            vectors.maybe_train()
+    return added
+
+
+_background = set()  # add_to_pool_later tasks still running
+
+
+async def add_to_pool(tenant, items):
+    """
+    Add (resume_id, resume_name, visible_text) items to the tenant's candidate
+    pool: the BM25 index and the vector index. Items already in the pool are
+    skipped; returns the items that were new to it.
+    """
+    if not items:
+        return []
+    return await asyncio.to_thread(_add_blocking, tenant, list(items))
+
+
+async def _add_logged(tenant, items):
+    try:
+        await add_to_pool(tenant, items)
+    except Exception as exc:
+        # Nobody is waiting on this; the pool can catch up on re-upload
+        print(f"Candidate pool not updated for {tenant}: {exc}")
+
+
+def add_to_pool_later(tenant, items):
+    """add_to_pool as a background task, for callers that should not wait on embedding."""
+    if not items:
+        return
+    task = asyncio.create_task(_add_logged(tenant, list(items)))
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+async def drain_pool_indexing():
+    """Wait for background pool updates, e.g. before shutdown."""
+    if _background:
+        await asyncio.gather(*list(_background), return_exceptions=True)
+
+
+def _remove_blocking(tenant, resume_id):
+    removed_keyword = get_tenant_index(tenant).delete(resume_id)
+    removed_vector = get_tenant_vector_index(tenant).delete(resume_id)
+    return removed_keyword or removed_vector
+
+
+async def remove_from_pool(tenant, resume_id):
+    """Drop a resume from both indexes; False if it was in neither."""
+    return await asyncio.to_thread(_remove_blocking, tenant, resume_id)
+
+
+def _search_blocking(tenant, job_description, top_k, include_text):
+    index = get_tenant_vector_index(tenant)
+    query = _embed_texts([job_description])[0]
+    results = []
+    for resume_id, resume_name, score in index.search(query, top_k):
+        result = {"resume_id": resume_id, "resume_name": resume_name, "score": round(score * 100, 2)}
+        if include_text:
+            result["visible_text"] = index.get_text(resume_id)
+        results.append(result)
+    return results
+
+
+async def search_pool(tenant, job_description, top_k=20, include_text=False):
+    """Nearest resumes to the JD by MiniLM cosine similarity (0-100), best first."""
+    return await asyncio.to_thread(_search_blocking, tenant, job_description, top_k, include_text)
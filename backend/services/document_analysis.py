@@ -0,0 +1,118 @@
+import time
+from collections import Counter
+
+import fitz
+import numpy as np
+
+from services.pdf_visibility import PageVisibility
+
+
+def compute_format_stats(font_sizes, font_names, x_positions):
+    """
+    Formatting consistency of a resume:
+    - font size consistency (share of spans in the most common size)
+    - font name consistency (share of spans in the most common font)
+    - alignment (spread of the x position where spans start)
+    """
+    size_counter = Counter(font_sizes)
+    most_common_size_count = size_counter.most_common(1)[0][1] if size_counter else 0
+    font_size_score = (most_common_size_count / len(font_sizes)) * 100 if font_sizes else 0
+
+    font_counter = Counter(font_names)
+    most_common_font_count = font_counter.most_common(1)[0][1] if font_counter else 0
+    font_name_score = (most_common_font_count / len(font_names)) * 100 if font_names else 0
+
+    if x_positions:
+        alignment_std = float(np.std(x_positions))
+        # Smaller std = better alignment
+        alignment_score = max(0, 100 - alignment_std * 10)
+    else:
+        alignment_std = 0.0
+        alignment_score = 0
+
+    # Weight: font size 40%, font name 30%, alignment 30%
+    format_score = 0.4 * font_size_score + 0.3 * font_name_score + 0.3 * alignment_score
+
+    return {
+        "spans": len(font_sizes),
+        "font_size_score": round(font_size_score, 2),
+        "font_name_score": round(font_name_score, 2),
+        "alignment_std": round(alignment_std, 2),
+        "alignment_score": round(alignment_score, 2),
+        "format_score": round(format_score, 2),
+    }
+
+
+def analyze_document(pdf_bytes):
+    """
+    Open a PDF once and walk its spans once, returning:
+    - visible_text: the resume text rebuilt from spans that passed the
+      visibility check, one line per PDF line and a blank line between blocks
+    - hidden_spans: text of the spans judged invisible
+    - format_stats: formatting consistency stats (see compute_format_stats)
+    - tier_stats: how the visibility checks were settled (see
+      pdf_visibility.record_tier_stats); callers pop it and record it in the
+      process that serves /metrics, since this often runs in a worker
+    - parse_ms: how long this took, measured here so time spent queued for
+      a worker is not counted; callers pop it for the document cache
+
+    Raises ValueError if the bytes are not a readable PDF.
+    """
+    started = time.perf_counter()
+    try:
+        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    except Exception as exc:
+        raise ValueError(f"Failed to read PDF: {exc}")
+
+    blocks_text = []
+    hidden_spans = []
+    font_sizes = []
+    font_names = []
+    x_positions = []
+    tier_stats = Counter()
+
+    try:
+        for page in doc:
+            visibility = PageVisibility(page)
+
+            for block in page.get_text("dict")["blocks"]:
+                if "lines" not in block:
+                    continue
+
+                lines_text = []
+                for line in block["lines"]:
+                    line_parts = []
+                    for span in line["spans"]:
+                        font_sizes.append(span["size"])
+                        font_names.append(span["font"])
+                        x_positions.append(span["bbox"][0])
+
+                        text = span["text"]
+                        if text.strip() == "":
+                            line_parts.append(text)
+                            continue
+
+                        visible_status, ratio, bg_rgb = visibility.classify(span)
+                        if visible_status:
+                            line_parts.append(text)
+                        else:
+                            hidden_spans.append(text)
+
+                    line_text = "".join(line_parts).strip()
+                    if line_text:
+                        lines_text.append(line_text)
+
+                if lines_text:
+                    blocks_text.append("\n".join(lines_text))
+
+            tier_stats.update(visibility.close())
+    finally:
+        doc.close()
+
+    return {
+        "visible_text": "\n\n".join(blocks_text),
+        "hidden_spans": hidden_spans,
+        "format_stats": compute_format_stats(font_sizes, font_names, x_positions),
+        "tier_stats": dict(tier_stats),
+        "parse_ms": (time.perf_counter() - started) * 1000,
+    }
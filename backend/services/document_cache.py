@@ -0,0 +1,161 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter
+
+from dotenv import load_dotenv
+
+from services.cache import LRUCache
+from services.document_analysis import analyze_document
+from services.pdf_visibility import record_tier_stats
+
+load_dotenv()
+
+DOCUMENT_CACHE_SIZE = int(os.getenv("DOCUMENT_CACHE_SIZE", "512"))
+# Optional disk tier that survives restarts and is shared by every worker;
+# unset keeps the cache in memory only. Entries are small JSON files, and a
+# hit refreshes the file's mtime, so stale ones can be pruned with
+# `find DIR -mtime +30 -delete`.
+DOCUMENT_CACHE_DIR = os.getenv("DOCUMENT_CACHE_DIR", "")
+# Bump when analyze_document's output changes so older disk entries are ignored
+DOCUMENT_CACHE_VERSION = "1"
+
+# sha256 of the PDF -> (analyze_document result, milliseconds the parse took)
+_memory = LRUCache(DOCUMENT_CACHE_SIZE)
+_counters = Counter()
+_counters_lock = threading.Lock()
+
+
+def _count(**amounts):
+    with _counters_lock:
+        _counters.update(amounts)
+
+
+def fingerprint(pdf_bytes):
+    return hashlib.sha256(pdf_bytes).hexdigest()
+
+
+def _disk_path(key):
+    return os.path.join(DOCUMENT_CACHE_DIR, f"v{DOCUMENT_CACHE_VERSION}", key[:2], key + ".json")
+
+
+def _disk_read(key):
+    path = _disk_path(key)
+    try:
+        with open(path, encoding="utf-8") as f:
+            entry = json.load(f)
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as exc:
+        print(f"Document cache read failed for {key}: {exc}")
+        return None
+    return entry["document"], entry["parse_ms"]
+
+
+def _disk_write(key, document, parse_ms):
+    path = _disk_path(key)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename, so a concurrent reader never sees half a file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"document": document, "parse_ms": parse_ms}, f)
+        os.replace(tmp_path, path)
+    except OSError as exc:
+        print(f"Document cache write failed for {key}: {exc}")
+
+
+def _hit(tier, parse_ms, lookup_ms):
+    _count(**{f"{tier}_hits": 1}, saved_ms=max(0.0, parse_ms - lookup_ms))
+
+
+def _memory_lookup(key, started):
+    entry = _memory.get(key)
+    if entry is None:
+        return None
+    _hit("memory", entry[1], (time.perf_counter() - started) * 1000)
+    return entry[0]
+
+
+def _disk_result(key, entry, started):
+    if entry is None:
+        _count(misses=1)
+        return None
+    _memory.set(key, entry)
+    _hit("disk", entry[1], (time.perf_counter() - started) * 1000)
+    return entry[0]
+
+
+def lookup(key):
+    """Cached analyze_document result for a fingerprint (memory, then disk), or None."""
+    started = time.perf_counter()
+    document = _memory_lookup(key, started)
+    if document is None:
+        document = _disk_result(key, _disk_read(key) if DOCUMENT_CACHE_DIR else None, started)
+    return document
+
+
+async def alookup(key):
+    """lookup() with the disk read in a thread."""
+    started = time.perf_counter()
+    document = _memory_lookup(key, started)
+    if document is None:
+        entry = await asyncio.to_thread(_disk_read, key) if DOCUMENT_CACHE_DIR else None
+        document = _disk_result(key, entry, started)
+    return document
+
+
+def _memory_store(key, document, parse_ms):
+    _memory.set(key, (document, parse_ms))
+    _count(stores=1, parse_ms=parse_ms)
+
+
+def store(key, document, parse_ms):
+    """
+    Cache a parse result, with the parse time analyze_document measured.
+    Callers share the cached dict, so treat it as read-only.
+    """
+    _memory_store(key, document, parse_ms)
+    if DOCUMENT_CACHE_DIR:
+        _disk_write(key, document, parse_ms)
+
+
+async def astore(key, document, parse_ms):
+    """store() with the disk write in a thread."""
+    _memory_store(key, document, parse_ms)
+    if DOCUMENT_CACHE_DIR:
+        await asyncio.to_thread(_disk_write, key, document, parse_ms)
+
+
+def analyze_document_cached(pdf_bytes):
+    """analyze_document in this thread, through the cache."""
+    key = fingerprint(pdf_bytes)
+    document = lookup(key)
+    if document is None:
+        document = analyze_document(pdf_bytes)
+        record_tier_stats(document.pop("tier_stats"))
+        store(key, document, document.pop("parse_ms"))
+    return document
+
+
+def get_stats():
+    with _counters_lock:
+        counters = dict(_counters)
+
+    hits = counters.get("memory_hits", 0) + counters.get("disk_hits", 0)
+    lookups = hits + counters.get("misses", 0)
+    stores = counters.get("stores", 0)
+    return {
+        "disk_tier": bool(DOCUMENT_CACHE_DIR),
+        "memory": _memory.stats(),
+        "memory_hits": counters.get("memory_hits", 0),
+        "disk_hits": counters.get("disk_hits", 0),
+        "misses": counters.get("misses", 0),
+        "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        "mean_parse_ms": round(counters.get("parse_ms", 0.0) / stores, 2) if stores else 0.0,
+        "latency_saved_seconds": round(counters.get("saved_ms", 0.0) / 1000, 3),
+    }
@@ -0,0 +1,220 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+
+import numpy as np
+from dotenv import load_dotenv
+
+from services.model_registry import get_sentence_model
+
+load_dotenv()
+
+EMBED_MAX_BATCH_SIZE = int(os.getenv("EMBED_MAX_BATCH_SIZE", "64"))
+EMBED_MAX_WAIT_MS = float(os.getenv("EMBED_MAX_WAIT_MS", "5"))
+
+_STOP = object()
+
+
+def _bucket(n):
+    """Histogram bucket label: the smallest power of two >= n."""
+    bound = 1
+    while bound < n:
+        bound *= 2
+    return bound
+
+
+class _Request:
+    def __init__(self, texts):
+        self.texts = texts
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class EmbeddingBatcher:
+    """
+    Gathers encode requests from concurrent callers into micro-batches.
+
+    A dedicated worker thread takes the first waiting request, keeps
+    collecting for up to max_wait_ms or until max_batch_size texts are
+    gathered, runs one encode_fn call for the whole batch and hands each
+    caller its own rows through a Future. A request larger than
+    max_batch_size is encoded on its own.
+    """
+
+    def __init__(self, encode_fn, max_batch_size=EMBED_MAX_BATCH_SIZE, max_wait_ms=EMBED_MAX_WAIT_MS):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._pending = None  # request taken from the queue that did not fit the last batch
+        self.requests = 0
+        self.batched_requests = 0
+        self.batches = 0
+        self.texts = 0
+        self.failed_batches = 0
+        self.cancelled = 0
+        self.max_queue_depth = 0
+        self.queue_wait_ms = 0.0
+        self.batch_sizes = Counter()
+        self.queue_depths = Counter()
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout=10):
+        """Finish the queued requests, then stop the worker."""
+        with self._start_lock:
+            if self._thread is None:
+                return
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def submit(self, texts):
+        """Queue texts for encoding; the Future resolves to an array with one row per text."""
+        request = _Request(list(texts))
+        if not request.texts:
+            request.future.set_result(np.zeros((0, 0), dtype=np.float32))
+            return request.future
+
+        self.start()
+        self._queue.put(request)
+        with self._stats_lock:
+            self.requests += 1
+        return request.future
+
+    def encode(self, texts):
+        """Blocking encode through the shared batches."""
+        return self.submit(texts).result()
+
+    async def aencode(self, texts):
+        return await asyncio.wrap_future(self.submit(texts))
+
+    def _take(self, timeout):
+        """
+        The next request (or _STOP), marked running so its caller can no
+        longer cancel it. Requests cancelled while queued (e.g. the client
+        disconnected) are dropped here instead of failing set_result later.
+        """
+        if self._pending is not None:
+            request, self._pending = self._pending, None
+            return request  # already marked running
+        while True:
+            request = self._queue.get(timeout=timeout) if timeout is not None else self._queue.get()
+            if request is _STOP or request.future.set_running_or_notify_cancel():
+                return request
+            with self._stats_lock:
+                self.cancelled += 1
+
+    def _next_batch(self):
+        first = self._take(None)
+        if first is _STOP:
+            return [], True
+
+        depth = self._queue.qsize() + 1
+        batch = [first]
+        size = len(first.texts)
+        deadline = time.perf_counter() + self.max_wait
+
+        while size < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0 and self._queue.empty():
+                break
+            try:
+                request = self._take(max(remaining, 0))
+            except queue.Empty:
+                break
+            if request is _STOP:
+                self._queue.put(_STOP)  # handled after this batch
+                break
+            if size + len(request.texts) > self.max_batch_size:
+                self._pending = request
+                break
+            batch.append(request)
+            size += len(request.texts)
+
+        with self._stats_lock:
+            self.max_queue_depth = max(self.max_queue_depth, depth)
+            self.queue_depths[_bucket(depth)] += 1
+        return batch, False
+
+    def _run(self):
+        while True:
+            batch, stopping = self._next_batch()
+            if stopping:
+                return
+            self._encode_batch(batch)
+
+    def _encode_batch(self, batch):
+        texts = [text for request in batch for text in request.texts]
+        started = time.perf_counter()
+        try:
+            embeddings = np.asarray(self.encode_fn(texts))
+        except Exception as exc:
+            with self._stats_lock:
+                self.failed_batches += 1
+            for request in batch:
+                request.future.set_exception(exc)
+            return
+
+        with self._stats_lock:
+            self.batches += 1
+            self.batched_requests += len(batch)
+            self.texts += len(texts)
+            self.batch_sizes[_bucket(len(texts))] += 1
+            self.queue_wait_ms += sum((started - request.enqueued_at) * 1000 for request in batch)
+
+        offset = 0
+        for request in batch:
+            request.future.set_result(embeddings[offset:offset + len(request.texts)])
+            offset += len(request.texts)
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self.max_queue_depth,
+                "requests": self.requests,
+                "batches": self.batches,
+                "failed_batches": self.failed_batches,
+                "cancelled": self.cancelled,
+                "texts": self.texts,
+                "mean_batch_size": round(self.texts / self.batches, 2) if self.batches else 0.0,
+                "mean_queue_wait_ms": (
+                    round(self.queue_wait_ms / self.batched_requests, 3) if self.batched_requests else 0.0
+                ),
+                # bucket upper bound (power of two) -> count
+                "batch_size_histogram": {str(k): v for k, v in sorted(self.batch_sizes.items())},
+                "queue_depth_histogram": {str(k): v for k, v in sorted(self.queue_depths.items())},
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+            }
+
+
+def _encode_with_sentence_model(texts):
+    return get_sentence_model().encode(texts, batch_size=EMBED_MAX_BATCH_SIZE)
+
+
+_batcher = EmbeddingBatcher(_encode_with_sentence_model)
+
+
+def get_embedding_batcher():
+    return _batcher
+
+
+def stop_embedding_batcher():
+    _batcher.stop()
+
+
+def get_embedding_batcher_stats():
+    return _batcher.stats()
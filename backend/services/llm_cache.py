@@ -0,0 +1,201 @@
+import hashlib
+import json
+import os
+import threading
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from dotenv import load_dotenv
+
+from db import get_db, get_sync_db
+from services.cache import LRUCache
+
+load_dotenv()
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") == "1"
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2048"))
+# The Mongo tier survives restarts and is shared by every worker
+LLM_CACHE_MONGO = os.getenv("LLM_CACHE_MONGO", "0") == "1"
+LLM_CACHE_COLLECTION = "llm_cache"
+
+DAY = 24 * 60 * 60
+
+# Seconds a response stays cached, per calling endpoint. Endpoints not listed
+# here are never cached. Override with LLM_CACHE_TTL_<NAME>, e.g.
+# LLM_CACHE_TTL_ROLE_ROADMAP=3600; 0 disables caching for that endpoint.
+DEFAULT_TTLS = {
+    "role_skills": 7 * DAY,
+    "role_roadmap": DAY,
+    "analyze_jd": DAY,
+    "company_role_analysis": DAY,
+    "career_switch": DAY,
+}
+
+_memory = LRUCache(LLM_CACHE_MAX_ENTRIES)
+_counters = Counter()
+_counters_lock = threading.Lock()
+
+
+def _count(name, endpoint):
+    with _counters_lock:
+        _counters[name] += 1
+        _counters[f"{endpoint}.{name}"] += 1
+
+
+def ttl_for(cache_name):
+    if not LLM_CACHE_ENABLED or cache_name is None or cache_name not in DEFAULT_TTLS:
+        return 0
+    return int(os.getenv(f"LLM_CACHE_TTL_{cache_name.upper()}", DEFAULT_TTLS[cache_name]))
+
+
+def is_cacheable(text):
+    """
+    Every cached endpoint asks for JSON, so a reply that does not parse
+    (even after stripping a ``` fence) is not worth keeping.
+    """
+    content = text.strip()
+    if content.startswith("```"):
+        content = content.split("```")[1].strip()
+        if content.lower().startswith("json"):
+            content = content[4:].strip()
+    try:
+        json.loads(content)
+        return True
+    except ValueError:
+        return False
+
+
+def normalize_prompt(text):
+    """Collapse whitespace so indentation-only differences share an entry."""
+    return " ".join(text.split())
+
+
+def make_cache_key(model, system_prompt, prompt, temperature, max_tokens):
+    payload = json.dumps(
+        {
+            "model": model,
+            "system": normalize_prompt(system_prompt),
+            "prompt": normalize_prompt(prompt),
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# Mongo drops expired entries through the expires_at TTL index in db.INDEXES
+def _sync_collection():
+    return get_sync_db()[LLM_CACHE_COLLECTION]
+
+
+def _async_collection():
+    return get_db()[LLM_CACHE_COLLECTION]
+
+
+def _live_query(key):
+    return {"_id": key, "expires_at": {"$gt": datetime.now(timezone.utc)}}
+
+
+def _entry(key, value, ttl):
+    now = datetime.now(timezone.utc)
+    return {"_id": key, "value": value, "created_at": now, "expires_at": now + timedelta(seconds=ttl)}
+
+
+def _promote(key, doc, cache_name):
+    """Copy a Mongo hit into the memory tier for the rest of its lifetime."""
+    if not doc:
+        _count("misses", cache_name)
+        return None
+
+    expires_at = doc["expires_at"]
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    remaining = (expires_at - datetime.now(timezone.utc)).total_seconds()
+
+    _memory.set(key, doc["value"], ttl=remaining)
+    _count("mongo_hits", cache_name)
+    return doc["value"]
+
+
+def _memory_lookup(key, cache_name):
+    value = _memory.get(key)
+    if value is not None:
+        _count("memory_hits", cache_name)
+    return value
+
+
+def lookup(key, cache_name):
+    """Cached value for key (memory first, then Mongo), or None on a miss."""
+    value = _memory_lookup(key, cache_name)
+    if value is not None:
+        return value
+
+    if not LLM_CACHE_MONGO:
+        _count("misses", cache_name)
+        return None
+
+    try:
+        doc = _sync_collection().find_one(_live_query(key), {"value": 1, "expires_at": 1})
+    except Exception as exc:
+        print(f"LLM cache Mongo read failed: {exc}")
+        doc = None
+    return _promote(key, doc, cache_name)
+
+
+def store(key, value, ttl, cache_name):
+    _memory.set(key, value, ttl=ttl)
+    _count("stores", cache_name)
+
+    if LLM_CACHE_MONGO:
+        try:
+            _sync_collection().replace_one({"_id": key}, _entry(key, value, ttl), upsert=True)
+        except Exception as exc:
+            print(f"LLM cache Mongo write failed: {exc}")
+
+
+async def alookup(key, cache_name):
+    value = _memory_lookup(key, cache_name)
+    if value is not None:
+        return value
+
+    if not LLM_CACHE_MONGO:
+        _count("misses", cache_name)
+        return None
+
+    try:
+        collection = _async_collection()
+        doc = await collection.find_one(_live_query(key), {"value": 1, "expires_at": 1})
+    except Exception as exc:
+        print(f"LLM cache Mongo read failed: {exc}")
+        doc = None
+    return _promote(key, doc, cache_name)
+
+
+async def astore(key, value, ttl, cache_name):
+    _memory.set(key, value, ttl=ttl)
+    _count("stores", cache_name)
+
+    if LLM_CACHE_MONGO:
+        try:
+            collection = _async_collection()
+            await collection.replace_one({"_id": key}, _entry(key, value, ttl), upsert=True)
+        except Exception as exc:
+            print(f"LLM cache Mongo write failed: {exc}")
+
+
+def record_bypass(cache_name):
+    _count("bypasses", cache_name)
+
+
+def get_stats():
+    with _counters_lock:
+        counters = dict(_counters)
+
+    return {
+        "enabled": LLM_CACHE_ENABLED,
+        "mongo_tier": LLM_CACHE_MONGO,
+        "memory": _memory.stats(),
+        "counters": counters,
+        "ttls": {name: ttl_for(name) for name in DEFAULT_TTLS},
+    }
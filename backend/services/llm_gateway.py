@@ -0,0 +1,259 @@
+import asyncio
+import os
+import random
+import time
+from dataclasses import asdict, dataclass, replace
+
+import httpx
+from dotenv import load_dotenv
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    AsyncOpenAI,
+    DefaultAsyncHttpxClient,
+    DefaultHttpxClient,
+    InternalServerError,
+    OpenAI,
+    RateLimitError,
+)
+
+from services import llm_cache
+from services.single_flight import SingleFlight
+
+load_dotenv()
+
+BASE_URL = os.getenv("LLM_BASE_URL", "https://openrouter.ai/api/v1")
+DEFAULT_MODEL = os.getenv("LLM_MODEL", "openai/gpt-4o-mini")
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "0.5"))
+LLM_BACKOFF_CAP = float(os.getenv("LLM_BACKOFF_CAP_SECONDS", "8"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "50"))
+
+CAREER_ADVISOR_PROMPT = "You are an expert career advisor and resume expert."
+INTERVIEWER_PROMPT = "You are a professional technical interviewer."
+
+RETRYABLE_ERRORS = (APITimeoutError, APIConnectionError, RateLimitError, InternalServerError)
+
+
+class LLMError(Exception):
+    """The LLM call failed after all retries, or came back without content."""
+
+
+@dataclass
+class LLMResult:
+    text: str
+    model: str
+    prompt_tokens: int
+    completion_tokens: int
+    latency_ms: float
+    attempts: int
+    cached: bool = False
+
+
+_async_client = None
+_sync_client = None
+_single_flight = SingleFlight()
+
+
+def _api_key():
+    return os.getenv("OPENROUTER_API_KEY_B") or os.getenv("OPENROUTER_API_KEY")
+
+
+def _limits():
+    return httpx.Limits(
+        max_connections=LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_MAX_CONNECTIONS,
+    )
+
+
+def get_async_client():
+    """Shared client with a keep-alive connection pool; created on first use."""
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncOpenAI(
+            api_key=_api_key(),
+            base_url=BASE_URL,
+            timeout=LLM_TIMEOUT,
+            max_retries=0,  # retries are handled here, with jitter
+            http_client=DefaultAsyncHttpxClient(limits=_limits()),
+        )
+    return _async_client
+
+
+def get_sync_client():
+    global _sync_client
+    if _sync_client is None:
+        _sync_client = OpenAI(
+            api_key=_api_key(),
+            base_url=BASE_URL,
+            timeout=LLM_TIMEOUT,
+            max_retries=0,
+            http_client=DefaultHttpxClient(limits=_limits()),
+        )
+    return _sync_client
+
+
+async def close_clients():
+    global _async_client, _sync_client
+    if _async_client is not None:
+        await _async_client.close()
+        _async_client = None
+    if _sync_client is not None:
+        _sync_client.close()
+        _sync_client = None
+
+
+def get_single_flight_stats():
+    return _single_flight.stats()
+
+
+def backoff_delay(attempt):
+    """Full-jitter exponential backoff: uniform(0, min(cap, base * 2**attempt))."""
+    return random.uniform(0, min(LLM_BACKOFF_CAP, LLM_BACKOFF_BASE * (2 ** attempt)))
+
+
+def _request_kwargs(prompt, system_prompt, model, temperature, max_tokens, timeout):
+    kwargs = {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt},
+        ],
+        "temperature": temperature,
+        "timeout": timeout or LLM_TIMEOUT,
+    }
+    if max_tokens is not None:
+        kwargs["max_tokens"] = max_tokens
+    return kwargs
+
+
+def _to_result(response, started, attempts):
+    text = response.choices[0].message.content if response.choices else None
+    if not text:
+        raise LLMError("LLM returned an empty response")
+
+    usage = response.usage
+    return LLMResult(
+        text=text,
+        model=response.model,
+        prompt_tokens=usage.prompt_tokens if usage else 0,
+        completion_tokens=usage.completion_tokens if usage else 0,
+        latency_ms=round((time.perf_counter() - started) * 1000, 1),
+        attempts=attempts,
+    )
+
+
+def _from_cache(value):
+    return replace(LLMResult(**value), cached=True, attempts=0, latency_ms=0.0)
+
+
+async def generate(
+    prompt,
+    system_prompt=CAREER_ADVISOR_PROMPT,
+    model=DEFAULT_MODEL,
+    temperature=0.7,
+    max_tokens=1000,
+    timeout=None,
+    cache_name=None,
+    bypass_cache=False,
+    cache_key=None,
+):
+    """
+    Run one chat completion; retries transient failures, raises LLMError otherwise.
+
+    cache_name names the calling endpoint in llm_cache.DEFAULT_TTLS; when set,
+    responses are served from and stored in the LLM cache. bypass_cache skips
+    the lookup but still refreshes the stored entry. cache_key, when given,
+    replaces the prompt in the cache key (e.g. the prompt built from a
+    canonical near-duplicate JD); the prompt itself is what gets sent.
+    Concurrent calls with the same normalized request are coalesced into one
+    upstream call.
+    """
+    ttl = llm_cache.ttl_for(cache_name)
+    flight_key = llm_cache.make_cache_key(model, system_prompt, prompt, temperature, max_tokens)
+    key = llm_cache.make_cache_key(model, system_prompt, cache_key or prompt, temperature, max_tokens)
+
+    if ttl and not bypass_cache:
+        cached = await llm_cache.alookup(key, cache_name)
+        if cached is not None:
+            return _from_cache(cached)
+    elif ttl:
+        llm_cache.record_bypass(cache_name)
+
+    async def fetch():
+        result = await _complete(prompt, system_prompt, model, temperature, max_tokens, timeout)
+        if ttl and llm_cache.is_cacheable(result.text):
+            await llm_cache.astore(key, asdict(result), ttl, cache_name)
+        return result
+
+    # Identical prompts already in flight share that call instead of starting another
+    return await _single_flight.do(flight_key, fetch)
+
+
+async def _complete(prompt, system_prompt, model, temperature, max_tokens, timeout):
+    kwargs = _request_kwargs(prompt, system_prompt, model, temperature, max_tokens, timeout)
+    started = time.perf_counter()
+
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        try:
+            response = await get_async_client().chat.completions.create(**kwargs)
+            return _to_result(response, started, attempt + 1)
+        except RETRYABLE_ERRORS as exc:
+            if attempt == LLM_MAX_RETRIES:
+                raise LLMError(f"LLM request failed after {attempt + 1} attempts: {exc}") from exc
+            await asyncio.sleep(backoff_delay(attempt))
+        except LLMError:
+            raise
+        except Exception as exc:
+            raise LLMError(f"LLM request failed: {exc}") from exc
+
+
+def generate_sync(
+    prompt,
+    system_prompt=CAREER_ADVISOR_PROMPT,
+    model=DEFAULT_MODEL,
+    temperature=0.7,
+    max_tokens=1000,
+    timeout=None,
+    cache_name=None,
+    bypass_cache=False,
+    cache_key=None,
+):
+    """Blocking twin of generate() for scripts and other non-async callers."""
+    ttl = llm_cache.ttl_for(cache_name)
+    flight_key = llm_cache.make_cache_key(model, system_prompt, prompt, temperature, max_tokens)
+    key = llm_cache.make_cache_key(model, system_prompt, cache_key or prompt, temperature, max_tokens)
+
+    if ttl and not bypass_cache:
+        cached = llm_cache.lookup(key, cache_name)
+        if cached is not None:
+            return _from_cache(cached)
+    elif ttl:
+        llm_cache.record_bypass(cache_name)
+
+    def fetch():
+        result = _complete_sync(prompt, system_prompt, model, temperature, max_tokens, timeout)
+        if ttl and llm_cache.is_cacheable(result.text):
+            llm_cache.store(key, asdict(result), ttl, cache_name)
+        return result
+
+    return _single_flight.do_sync(flight_key, fetch)
+
+
+def _complete_sync(prompt, system_prompt, model, temperature, max_tokens, timeout):
+    kwargs = _request_kwargs(prompt, system_prompt, model, temperature, max_tokens, timeout)
+    started = time.perf_counter()
+
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        try:
+            response = get_sync_client().chat.completions.create(**kwargs)
+            return _to_result(response, started, attempt + 1)
+        except RETRYABLE_ERRORS as exc:
+            if attempt == LLM_MAX_RETRIES:
+                raise LLMError(f"LLM request failed after {attempt + 1} attempts: {exc}") from exc
+            time.sleep(backoff_delay(attempt))
+        except LLMError:
+            raise
+        except Exception as exc:
+            raise LLMError(f"LLM request failed: {exc}") from exc
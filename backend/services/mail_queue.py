@@ -0,0 +1,203 @@
+import os
+import queue
+import random
+import smtplib
+import threading
+import time
+
+from dotenv import load_dotenv
+
+from sendMail import EMAIL_USER, build_message, close_smtp_connection, open_smtp_connection
+
+load_dotenv()
+
+MAIL_QUEUE_SIZE = int(os.getenv("MAIL_QUEUE_SIZE", "1000"))
+MAIL_BATCH_SIZE = int(os.getenv("MAIL_BATCH_SIZE", "50"))
+MAIL_BATCH_WAIT = float(os.getenv("MAIL_BATCH_WAIT_SECONDS", "1"))
+MAIL_MAX_RETRIES = int(os.getenv("MAIL_MAX_RETRIES", "3"))
+MAIL_BACKOFF_BASE = float(os.getenv("MAIL_BACKOFF_BASE_SECONDS", "1"))
+MAIL_BACKOFF_CAP = float(os.getenv("MAIL_BACKOFF_CAP_SECONDS", "30"))
+# Close the connection after this long without mail instead of letting the server drop it
+MAIL_IDLE_TIMEOUT = float(os.getenv("MAIL_IDLE_TIMEOUT_SECONDS", "60"))
+
+# Rejections that retrying will not fix. Every other SMTP or socket error
+# (smtplib.SMTPException is an OSError) drops the connection and retries.
+PERMANENT_ERRORS = (
+    smtplib.SMTPRecipientsRefused,
+    smtplib.SMTPSenderRefused,
+    smtplib.SMTPAuthenticationError,
+)
+
+_STOP = object()
+
+
+class MailQueue:
+    """
+    Sends mail from a background thread over one reused SMTP connection.
+
+    enqueue() returns immediately. The worker drains the queue in batches of
+    up to MAIL_BATCH_SIZE (waiting at most MAIL_BATCH_WAIT for a batch to
+    fill), keeps only the latest message per recipient within a batch, and
+    retries connection failures with full-jitter backoff.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue(maxsize=MAIL_QUEUE_SIZE)
+        self._thread = None
+        self._server = None
+        self._last_used = 0.0
+        self.enqueued = 0
+        self.dropped = 0
+        self.deduplicated = 0
+        self.sent = 0
+        self.failed = 0
+        self.batches = 0
+        self.connections = 0
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="mail-queue", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=30):
+        """Send what is already queued (up to timeout seconds), then close the connection."""
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            print("Mail queue still full at shutdown; queued mail is lost")
+        self._thread.join(timeout)
+        self._thread = None
+
+    def enqueue(self, user):
+        """Queue one {"mail", "skills_missing", "improvement_suggestions"} entry; False if dropped."""
+        if not user.get("mail"):
+            print("Skipping mail without a recipient address")
+            return False
+        try:
+            self._queue.put_nowait(user)
+        except queue.Full:
+            self.dropped += 1
+            print(f"Mail queue full, dropping mail to {user['mail']}")
+            return False
+        self.enqueued += 1
+        return True
+
+    def _next_batch(self):
+        """Block for the first item, then gather more until the batch fills or the wait ends."""
+        try:
+            first = self._queue.get(timeout=MAIL_IDLE_TIMEOUT)
+        except queue.Empty:
+            self._disconnect()
+            return [], False
+        if first is _STOP:
+            return [], True
+
+        batch = [first]
+        deadline = time.monotonic() + MAIL_BATCH_WAIT
+        while len(batch) < MAIL_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = self._next_batch()
+            if batch:
+                self._send_batch(batch)
+        self._disconnect()
+
+    def _send_batch(self, batch):
+        # Latest entry per recipient wins, in first-seen order
+        by_recipient = {}
+        for user in batch:
+            by_recipient[user["mail"].strip().lower()] = user
+        self.deduplicated += len(batch) - len(by_recipient)
+        self.batches += 1
+
+        for user in by_recipient.values():
+            try:
+                self._send_one(user)
+            except Exception as exc:
+                # Never let one bad entry stop the worker thread
+                self.failed += 1
+                print(f"Failed to send mail to {user.get('mail')}: {exc}")
+
+    def _send_one(self, user):
+        receiver_email = user["mail"]
+        message = build_message(user).as_string()
+
+        for attempt in range(MAIL_MAX_RETRIES + 1):
+            try:
+                self._connection().sendmail(EMAIL_USER or "", receiver_email, message)
+                self._last_used = time.monotonic()
+                self.sent += 1
+                print(f"Mail sent to {receiver_email}")
+                return
+            except PERMANENT_ERRORS as exc:
+                error = exc
+                break
+            except OSError as exc:
+                self._disconnect()
+                if attempt == MAIL_MAX_RETRIES:
+                    error = exc
+                    break
+                time.sleep(random.uniform(0, min(MAIL_BACKOFF_CAP, MAIL_BACKOFF_BASE * (2 ** attempt))))
+
+        self.failed += 1
+        print(f"Failed to send mail to {receiver_email}: {error}")
+
+    def _connection(self):
+        if self._server is not None and time.monotonic() - self._last_used > MAIL_IDLE_TIMEOUT:
+            self._disconnect()
+        if self._server is None:
+            self._server = open_smtp_connection()
+            self._last_used = time.monotonic()
+            self.connections += 1
+        return self._server
+
+    def _disconnect(self):
+        if self._server is not None:
+            close_smtp_connection(self._server)
+            self._server = None
+
+    def stats(self):
+        return {
+            "queued": self._queue.qsize(),
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "deduplicated": self.deduplicated,
+            "sent": self.sent,
+            "failed": self.failed,
+            "batches": self.batches,
+            "connections": self.connections,
+        }
+
+
+_mail_queue = MailQueue()
+
+
+def start_mail_queue():
+    _mail_queue.start()
+
+
+def stop_mail_queue(timeout=30):
+    _mail_queue.stop(timeout)
+
+
+def enqueue_mail(user):
+    """Hand a mail to the background sender; starts it on first use outside the app."""
+    _mail_queue.start()
+    return _mail_queue.enqueue(user)
+
+
+def get_mail_queue_stats():
+    return _mail_queue.stats()
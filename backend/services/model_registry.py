@@ -0,0 +1,158 @@
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+SENTENCE_MODEL_NAME = os.getenv("SENTENCE_MODEL_NAME", "all-MiniLM-L6-v2")
+# torch (SentenceTransformer), onnx or onnx-int8 (exported by scripts/export_onnx.py)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+EMBEDDING_ONNX_DIR = os.getenv("EMBEDDING_ONNX_DIR", os.path.join(DATA_DIR, f"{SENTENCE_MODEL_NAME}-onnx"))
+EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS", "0")) or None
+
+GLOVE_MODEL_NAME = os.getenv("GLOVE_MODEL_NAME", "glove-wiki-gigaword-100")
+# Native KeyedVectors file written by scripts/convert_glove.py, opened memory-mapped
+GLOVE_KV_PATH = os.getenv("GLOVE_KV_PATH", os.path.join(DATA_DIR, f"{GLOVE_MODEL_NAME}.kv"))
+# Download through gensim-data into the process heap when GLOVE_KV_PATH is missing
+GLOVE_ALLOW_DOWNLOAD = os.getenv("GLOVE_ALLOW_DOWNLOAD", "0") == "1"
+# Comma-separated model names (or "all") to load in the app lifespan; empty loads on first use
+WARMUP_MODELS = os.getenv("WARMUP_MODELS", "")
+
+SENTENCE_MODEL = "sentence_transformer"
+GLOVE_MODEL = "glove"
+
+
+class ModelRegistry:
+    """
+    Loads each registered model once, on first get(), from any thread.
+
+    Loaders import their heavy libraries themselves, so importing a module
+    that uses the registry costs nothing until a model is actually needed.
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._models = {}
+        self._status = {}
+        self._locks = {}
+
+    def register(self, name, loader):
+        self._loaders[name] = loader
+        self._locks[name] = threading.Lock()
+        self._status[name] = {"state": "not_loaded", "load_seconds": None, "error": None}
+
+    def get(self, name):
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        with self._locks[name]:
+            # Another thread may have finished loading while we waited
+            model = self._models.get(name)
+            if model is not None:
+                return model
+
+            status = self._status[name]
+            status.update(state="loading", error=None)
+            started = time.perf_counter()
+            try:
+                model = self._loaders[name]()
+            except Exception as exc:
+                status.update(state="failed", error=str(exc))
+                raise
+            status.update(state="ready", load_seconds=round(time.perf_counter() - started, 3))
+            print(f"✅ Loaded {name} in {status['load_seconds']}s")
+            self._models[name] = model
+            return model
+
+    def names(self):
+        return list(self._loaders)
+
+    def is_ready(self, name):
+        return self._status[name]["state"] == "ready"
+
+    def status(self):
+        return {name: dict(status) for name, status in self._status.items()}
+
+
+def _load_sentence_model():
+    """The sentence encoder for EMBEDDING_BACKEND; every backend exposes encode(texts, batch_size)."""
+    if EMBEDDING_BACKEND == "torch":
+        from sentence_transformers import SentenceTransformer
+
+        return SentenceTransformer(SENTENCE_MODEL_NAME, device="cpu")
+
+    from services.onnx_encoder import ONNX_MODEL_FILES, OnnxSentenceEncoder
+
+    if EMBEDDING_BACKEND not in ONNX_MODEL_FILES:
+        raise ValueError(f"Unknown EMBEDDING_BACKEND {EMBEDDING_BACKEND!r}; use torch, onnx or onnx-int8")
+    return OnnxSentenceEncoder(EMBEDDING_ONNX_DIR, ONNX_MODEL_FILES[EMBEDDING_BACKEND], threads=EMBEDDING_THREADS)
+
+
+def _load_glove():
+    """
+    Open the converted vectors read-only and memory-mapped, so every worker
+    shares one copy through the page cache instead of holding its own.
+    """
+    if os.path.exists(GLOVE_KV_PATH):
+        from gensim.models import KeyedVectors
+
+        return KeyedVectors.load(GLOVE_KV_PATH, mmap="r")
+
+    if not GLOVE_ALLOW_DOWNLOAD:
+        raise FileNotFoundError(
+            f"GloVe vectors not found at {GLOVE_KV_PATH}; run scripts/convert_glove.py "
+            "or set GLOVE_ALLOW_DOWNLOAD=1"
+        )
+
+    import gensim.downloader as api
+
+    print(f"⚠ {GLOVE_KV_PATH} missing, downloading {GLOVE_MODEL_NAME} into memory")
+    return api.load(GLOVE_MODEL_NAME)
+
+
+registry = ModelRegistry()
+registry.register(SENTENCE_MODEL, _load_sentence_model)
+registry.register(GLOVE_MODEL, _load_glove)
+
+
+def get_sentence_model():
+    return registry.get(SENTENCE_MODEL)
+
+
+def get_word_vectors():
+    return registry.get(GLOVE_MODEL)
+
+
+def warmup_names():
+    names = [name.strip() for name in WARMUP_MODELS.split(",") if name.strip()]
+    if names == ["all"]:
+        return registry.names()
+    unknown = set(names) - set(registry.names())
+    if unknown:
+        raise ValueError(f"Unknown WARMUP_MODELS entries: {sorted(unknown)}")
+    return names
+
+
+def warm_up(names=None):
+    """Load the given models (default: WARMUP_MODELS); failures are recorded, not raised."""
+    for name in warmup_names() if names is None else names:
+        try:
+            registry.get(name)
+        except Exception as exc:
+            print(f"Failed to load {name}: {exc}")
+
+
+def get_model_status():
+    """Load state and time per model, plus whether every warm-up model is ready."""
+    names = warmup_names()
+    return {
+        "ready": all(registry.is_ready(name) for name in names),
+        "warmup": names,
+        "embedding_backend": EMBEDDING_BACKEND,
+        "models": registry.status(),
+    }
@@ -0,0 +1,233 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from dotenv import load_dotenv
+
+from services.bm25_index import tokenize
+
+load_dotenv()
+
+JD_DEDUP_ENABLED = os.getenv("JD_DEDUP_ENABLED", "1") == "1"
+# Estimated Jaccard similarity of word shingles at which a JD counts as a
+# near-duplicate of an earlier one; see benchmarks/bench_jd_dedup.py
+JD_DEDUP_THRESHOLD = float(os.getenv("JD_DEDUP_THRESHOLD", "0.8"))
+JD_DEDUP_MAX_ENTRIES = int(os.getenv("JD_DEDUP_MAX_ENTRIES", "2000"))
+JD_DEDUP_MAX_TENANTS = int(os.getenv("JD_DEDUP_MAX_TENANTS", "1000"))
+# Resumes in one screening batch at or above this similarity are the same candidate
+RESUME_DEDUP_ENABLED = os.getenv("RESUME_DEDUP_ENABLED", "1") == "1"
+RESUME_DEDUP_THRESHOLD = float(os.getenv("RESUME_DEDUP_THRESHOLD", "0.9"))
+
+NUM_PERM = 128
+SHINGLE_WORDS = 3
+
+# Fixed seed, so a text gets the same signature in every process
+_rng = np.random.default_rng(20240601)
+_MULTIPLIERS = _rng.integers(0, 2**63, NUM_PERM, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_OFFSETS = _rng.integers(0, 2**63, NUM_PERM, dtype=np.uint64)
+
+
+def shingles(text):
+    """Overlapping SHINGLE_WORDS-word runs of the normalized text (single words for very short text)."""
+    words = tokenize(text)
+    if len(words) < SHINGLE_WORDS:
+        return set(words)
+    return {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def signature(text):
+    """MinHash signature (NUM_PERM uint32 values), or None for text without words."""
+    text_shingles = shingles(text)
+    if not text_shingles:
+        return None
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little") for s in text_shingles),
+        dtype=np.uint64,
+        count=len(text_shingles),
+    )
+    # Multiply-shift hashing gives one independent permutation per column
+    with np.errstate(over="ignore"):
+        permuted = (hashes[:, None] * _MULTIPLIERS + _OFFSETS) >> np.uint64(32)
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def similarity(signature_a, signature_b):
+    """Estimated Jaccard similarity: the share of matching MinHash values."""
+    return float(np.count_nonzero(signature_a == signature_b)) / len(signature_a)
+
+
+def lsh_bands(num_perm, threshold, recall=0.99):
+    """
+    (bands, rows) for LSH over num_perm values: the most rows per band for
+    which a pair exactly at the threshold still shares a band with the given
+    probability. More rows means fewer dissimilar candidates to check.
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        if 1 - (1 - threshold ** rows) ** bands >= recall:
+            best = (bands, rows)
+    return best
+
+
+class NearDuplicateIndex:
+    """
+    MinHash/LSH index mapping a text to the most similar earlier text at or
+    above a Jaccard threshold.
+
+    Signatures are split into bands; texts sharing any band are candidates,
+    and candidates are confirmed on the full signature. The index keeps the
+    max_entries most recently added texts.
+    """
+
+    def __init__(self, threshold=JD_DEDUP_THRESHOLD, max_entries=JD_DEDUP_MAX_ENTRIES):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.bands, self.rows = lsh_bands(NUM_PERM, threshold)
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (signature, value)
+        self._buckets = [{} for _ in range(self.bands)]  # band -> {band bytes: set of keys}
+        self.lookups = 0
+        self.matches = 0
+        self.candidates = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _band_keys(self, text_signature):
+        return [text_signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def add(self, key, text_signature, value):
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = (text_signature, value)
+            for band, band_key in zip(self._buckets, self._band_keys(text_signature)):
+                band.setdefault(band_key, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        text_signature, _ = self._entries.pop(key)
+        for band, band_key in zip(self._buckets, self._band_keys(text_signature)):
+            keys = band.get(band_key)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del band[band_key]
+
+    def query(self, text_signature):
+        """(key, value, similarity) of the closest entry at or above the threshold, or None."""
+        with self._lock:
+            self.lookups += 1
+            candidates = set()
+            for band, band_key in zip(self._buckets, self._band_keys(text_signature)):
+                candidates.update(band.get(band_key, ()))
+            self.candidates += len(candidates)
+
+            best = None
+            for key in candidates:
+                score = similarity(text_signature, self._entries[key][0])
+                if score >= self.threshold and (best is None or score > best[2]):
+                    best = (key, self._entries[key][1], score)
+            if best is not None:
+                self.matches += 1
+            return best
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+                "bands": self.bands,
+                "rows": self.rows,
+                "lookups": self.lookups,
+                "matches": self.matches,
+                "match_rate": round(self.matches / self.lookups, 4) if self.lookups else 0.0,
+                "mean_candidates": round(self.candidates / self.lookups, 2) if self.lookups else 0.0,
+            }
+
+
+# One index per tenant, so a JD is only ever matched with the same user's earlier JDs
+_jds = OrderedDict()  # tenant -> NearDuplicateIndex, least recently used first
+_jds_lock = threading.Lock()
+
+
+def _tenant_jds(tenant):
+    with _jds_lock:
+        index = _jds.get(tenant)
+        if index is None:
+            index = _jds[tenant] = NearDuplicateIndex()
+            while len(_jds) > JD_DEDUP_MAX_TENANTS:
+                _jds.popitem(last=False)
+        else:
+            _jds.move_to_end(tenant)
+        return index
+
+
+def canonical_jd(job_description, tenant):
+    """
+    Text to build cache and store keys from: the tenant's earlier JD this one
+    is a near-duplicate of, so their keys match; otherwise the JD itself,
+    which then becomes the canonical text for the tenant's later near-duplicates.
+
+    Only for keys: prompts and stored targets always use the submitted JD.
+    """
+    if not JD_DEDUP_ENABLED or not job_description:
+        return job_description
+    jd_signature = signature(job_description)
+    if jd_signature is None:
+        return job_description
+
+    index = _tenant_jds(tenant)
+    match = index.query(jd_signature)
+    if match is not None:
+        return match[1]
+    key = hashlib.sha256(" ".join(tokenize(job_description)).encode("utf-8")).hexdigest()
+    index.add(key, jd_signature, job_description)
+    return job_description
+
+
+def group_near_duplicates(texts, threshold):
+    """
+    For each text, (index of its group's representative, similarity to it).
+    The first text of each group represents it; a representative points to
+    itself with similarity 1.0. Texts without words are never grouped.
+    """
+    index = NearDuplicateIndex(threshold=threshold, max_entries=max(1, len(texts)))
+    groups = []
+    for i, text in enumerate(texts):
+        text_signature = signature(text)
+        match = index.query(text_signature) if text_signature is not None else None
+        if match is not None:
+            groups.append((match[0], match[2]))
+        else:
+            if text_signature is not None:
+                index.add(i, text_signature, i)
+            groups.append((i, 1.0))
+    return groups
+
+
+def get_jd_dedup_stats():
+    with _jds_lock:
+        indexes = list(_jds.values())
+    per_tenant = [index.stats() for index in indexes]
+    lookups = sum(stats["lookups"] for stats in per_tenant)
+    matches = sum(stats["matches"] for stats in per_tenant)
+    candidates = sum(index.candidates for index in indexes)
+    return {
+        "enabled": JD_DEDUP_ENABLED,
+        "tenants": len(per_tenant),
+        "entries": sum(stats["entries"] for stats in per_tenant),
+        "max_entries_per_tenant": JD_DEDUP_MAX_ENTRIES,
+        "threshold": JD_DEDUP_THRESHOLD,
+        "lookups": lookups,
+        "matches": matches,
+        "match_rate": round(matches / lookups, 4) if lookups else 0.0,
+        "mean_candidates": round(candidates / lookups, 2) if lookups else 0.0,
+    }
@@ -0,0 +1,75 @@
+import json
+import os
+
+import numpy as np
+
+# EMBEDDING_BACKEND value -> model file written by scripts/export_onnx.py
+ONNX_MODEL_FILES = {"onnx": "model.onnx", "onnx-int8": "model_int8.onnx"}
+
+
+class OnnxSentenceEncoder:
+    """
+    CPU stand-in for SentenceTransformer.encode over an exported model.
+
+    Tokenizes with the saved fast tokenizer, runs the transformer through
+    onnxruntime, mean-pools over the attention mask and L2-normalizes, which
+    is the all-MiniLM-L6-v2 pipeline. Texts are sorted by length so each
+    batch pads to a similar size, as sentence-transformers does.
+    """
+
+    def __init__(self, model_dir, model_file="model.onnx", threads=None):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        with open(os.path.join(model_dir, "encoder_config.json"), encoding="utf-8") as f:
+            config = json.load(f)
+        if config.get("pooling", "mean") != "mean":
+            raise ValueError(f"Unsupported pooling {config['pooling']!r} in {model_dir}")
+
+        self.max_seq_length = config["max_seq_length"]
+        self.normalize = config.get("normalize", True)
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=self.max_seq_length)
+        self.tokenizer.enable_padding(pad_id=config.get("pad_token_id", 0), pad_token=config.get("pad_token", "[PAD]"))
+
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, model_file), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {node.name for node in self.session.get_inputs()}
+        self.dimension = self.session.get_outputs()[0].shape[-1]
+
+    def encode(self, texts, batch_size=32, **kwargs):
+        """Embeddings as a float32 array with one row per text (one vector for a single string)."""
+        if isinstance(texts, str):
+            return self.encode([texts], batch_size)[0]
+
+        texts = list(texts)
+        embeddings = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+
+        for start in range(0, len(texts), batch_size):
+            rows = order[start:start + batch_size]
+            embeddings[rows] = self._encode_batch([texts[i] for i in rows])
+        return embeddings
+
+    def _encode_batch(self, texts):
+        encodings = self.tokenizer.encode_batch(texts)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": attention_mask,
+        }
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+
+        token_embeddings = self.session.run(None, feeds)[0]
+
+        mask = attention_mask[..., None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        if self.normalize:
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled
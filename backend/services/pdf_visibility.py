@@ -0,0 +1,291 @@
+import threading
+from collections import Counter
+
+import fitz
+import numpy as np
+
+RASTER_DPI = 200
+WHITE = (255, 255, 255)
+
+# A pixel this close to the text colour on every channel is treated as
+# glyph ink and left out of the background estimate.
+TEXT_COLOR_TOLERANCE = 20
+
+
+def rgb_from_int(color):
+    return (color >> 16 & 255, color >> 8 & 255, color & 255)
+
+
+def dominant_color(pixels, text_rgb):
+    """
+    Most common colour in an (..., 3) pixel block, ignoring pixels close to the
+    text colour. Ties go to the colour seen first in row-major order, which is
+    what Counter.most_common returned for the old per-pixel loop.
+    """
+    band = pixels.reshape(-1, 3).astype(np.int32)
+    if band.size == 0:
+        return WHITE
+
+    text = np.asarray(text_rgb, dtype=np.int32)
+    band = band[(np.abs(band - text) >= TEXT_COLOR_TOLERANCE).any(axis=1)]
+    if band.size == 0:
+        return WHITE
+
+    keys = (band[:, 0] << 16) | (band[:, 1] << 8) | band[:, 2]
+    unique_keys, first_seen, counts = np.unique(keys, return_index=True, return_counts=True)
+    candidates = np.flatnonzero(counts == counts.max())
+    key = int(unique_keys[candidates[np.argmin(first_seen[candidates])]])
+
+    return rgb_from_int(key)
+
+
+def relative_luminance(rgb):
+    def convert(c):
+        c = c / 255
+        if c <= 0.03928:
+            return c / 12.92
+        else:
+            return ((c + 0.055) / 1.055) ** 2.4
+
+    r, g, b = rgb
+    r_lin = convert(r)
+    g_lin = convert(g)
+    b_lin = convert(b)
+
+    return 0.2126 * r_lin + 0.7152 * g_lin + 0.0722 * b_lin
+
+
+def contrast_ratio(rgb1, rgb2):
+    L1 = relative_luminance(rgb1)
+    L2 = relative_luminance(rgb2)
+
+    lighter = max(L1, L2)
+    darker = min(L1, L2)
+
+    return (lighter + 0.05) / (darker + 0.05)
+
+
+def is_text_visible(text_rgb, bg_rgb, font_size):
+    ratio = contrast_ratio(text_rgb, bg_rgb)
+
+    # Rule 1: Very small font
+    if font_size <= 5:
+        return False, ratio
+
+    # Rule 2: Very low contrast
+    if ratio < 1.5:
+        return False, ratio
+
+    # Rule 3: Weak contrast
+    if ratio < 3:
+        return "Hard to See", ratio
+
+    return True, ratio
+
+
+# ==============================
+# Tiered span classifier
+# ==============================
+
+TIER_GEOMETRY = "geometry"
+TIER_RASTER = "raster"
+
+_tier_counts = Counter()
+_tier_lock = threading.Lock()
+
+
+def fill_to_rgb(fill):
+    return tuple(int(c * 255 + 0.5) for c in fill[:3])
+
+
+def span_sample_rect(rect):
+    """The middle band of a span, the same region the raster sampler reads."""
+    height = rect.y1 - rect.y0
+    return fitz.Rect(rect.x0, rect.y0 + height * 0.35, rect.x1, rect.y0 + height * 0.65)
+
+
+class PageVisibility:
+    """
+    Decides span visibility for one page, cheapest evidence first.
+
+    The geometry tier settles spans from PyMuPDF vector data alone: tiny
+    fonts, fully transparent text (except over an image, where it is a
+    scanned page's OCR layer), text outside the page box, and text whose
+    sampled band sits on plain page background or entirely inside one opaque
+    filled rectangle. Paint order matters there: a rectangle painted before
+    the text is its background, while one painted after it covers the text,
+    which is then hidden whatever its colour. Anything else (images, partial
+    overlaps, strokes, curves, transparency, unknown paint order) falls back
+    to rasterizing just the span's box.
+    """
+
+    def __init__(self, page):
+        self.page = page
+        self.page_rect = page.rect
+        self.display_list = None
+        self.text_order = None
+        self.stats = Counter()
+
+        self.drawings = []
+        for drawing in page.get_drawings():
+            items = drawing.get("items") or []
+            opaque_rect = (
+                drawing.get("fill") is not None
+                and (drawing.get("fill_opacity") or 0) >= 1
+                and len(items) == 1
+                and (items[0][0] == "re" or (items[0][0] == "qu" and items[0][1].is_rectangular))
+            )
+            fill_rgb = fill_to_rgb(drawing["fill"]) if opaque_rect else None
+            self.drawings.append((fitz.Rect(drawing["rect"]), fill_rgb, drawing.get("seqno")))
+
+        self.image_rects = [fitz.Rect(info["bbox"]) for info in page.get_image_info()]
+
+    def text_seqnos(self, span):
+        """
+        Content-stream positions of the text pieces making up a span, matched
+        from get_texttrace() by baseline and horizontal overlap. Empty if none match.
+        """
+        if self.text_order is None:
+            self.text_order = {}
+            for trace in self.page.get_texttrace():
+                if not trace["chars"]:
+                    continue
+                baseline = round(trace["chars"][0][2][1], 1)
+                x0, _, x1, _ = trace["bbox"]
+                self.text_order.setdefault(baseline, []).append((x0, x1, trace["seqno"]))
+
+        x0, _, x1, _ = span["bbox"]
+        baseline = round(span["origin"][1], 1)
+        seqnos = []
+        for key in (baseline, round(baseline - 0.1, 1), round(baseline + 0.1, 1)):
+            for trace_x0, trace_x1, seqno in self.text_order.get(key, ()):
+                if trace_x0 < x1 and trace_x1 > x0:
+                    seqnos.append(seqno)
+        return seqnos
+
+    def background_from_geometry(self, rect, seqnos):
+        """
+        (background colour, covered) for the span's sampled band, or None if
+        unsure. covered means an opaque rectangle was painted over the text.
+        """
+        band = span_sample_rect(rect) & self.page_rect
+        if band.is_empty:
+            return None
+
+        if any(image_rect.intersects(band) for image_rect in self.image_rects):
+            return None
+
+        # Drawings are in paint order, so the last one touching the band is on top
+        for drawing_rect, fill_rgb, seqno in reversed(self.drawings):
+            if not drawing_rect.intersects(band):
+                continue
+            if fill_rgb is None or not drawing_rect.contains(band) or seqno is None or not seqnos:
+                return None
+            if seqno > max(seqnos):
+                return fill_rgb, True
+            if seqno < min(seqnos):
+                return fill_rgb, False
+            return None
+
+        return WHITE, False
+
+    def background_from_raster(self, rect, text_rgb):
+        """
+        (background colour, covered) from a render clipped to the span's box.
+        The page's display list is built once and reused for every clip. A box
+        with no pixel standing out from the background shows no glyphs at all,
+        so something was painted over the text (or it matches the background).
+        """
+        clip = rect & self.page_rect
+        if clip.is_empty:
+            return WHITE, False
+
+        if self.display_list is None:
+            self.display_list = self.page.get_displaylist()
+
+        zoom = RASTER_DPI / 72
+        pix = self.display_list.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=clip, alpha=False)
+        self.stats["regions_rendered"] += 1
+        pixels = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)[..., :3]
+        if pixels.size == 0:
+            return WHITE, False
+
+        # Sample the middle band of the span, where the background shows between glyphs
+        height = pixels.shape[0]
+        band = pixels[int(height * 0.35):max(int(height * 0.65), int(height * 0.35) + 1)]
+        bg_rgb = dominant_color(band, text_rgb)
+
+        background = np.asarray(bg_rgb, dtype=np.int32)
+        ink = (np.abs(pixels.astype(np.int32) - background) >= TEXT_COLOR_TOLERANCE).any(axis=-1).any()
+        return bg_rgb, not ink
+
+    def classify(self, span):
+        """Return (visible_status, contrast_ratio, background_rgb) for a text span."""
+        rect = fitz.Rect(span["bbox"])
+        text_rgb = rgb_from_int(span["color"])
+        font_size = span["size"]
+
+        # Invisible text over an image is the OCR layer of a scanned page: the
+        # image shows the words, so the raster tier judges what is under it
+        ocr_layer = span.get("alpha", 255) == 0 and any(image_rect.intersects(rect) for image_rect in self.image_rects)
+        if (span.get("alpha", 255) == 0 and not ocr_layer) or not rect.intersects(self.page_rect):
+            self.stats[TIER_GEOMETRY] += 1
+            return False, contrast_ratio(text_rgb, WHITE), WHITE
+
+        if font_size <= 5:
+            self.stats[TIER_GEOMETRY] += 1
+            visible_status, ratio = is_text_visible(text_rgb, WHITE, font_size)
+            return visible_status, ratio, WHITE
+
+        background = self.background_from_geometry(rect, self.text_seqnos(span))
+        if background is not None:
+            self.stats[TIER_GEOMETRY] += 1
+        else:
+            self.stats[TIER_RASTER] += 1
+            background = self.background_from_raster(rect, text_rgb)
+
+        bg_rgb, covered = background
+        if covered:
+            return False, contrast_ratio(text_rgb, bg_rgb), bg_rgb
+
+        visible_status, ratio = is_text_visible(text_rgb, bg_rgb, font_size)
+        return visible_status, ratio, bg_rgb
+
+    def close(self):
+        """
+        Release the display list and return this page's tier counts, for the
+        caller to pass to record_tier_stats() in the process serving metrics.
+        """
+        self.display_list = None
+        self.stats["pages"] += 1
+        if self.stats["regions_rendered"]:
+            self.stats["pages_rasterized"] += 1
+        return self.stats
+
+
+def record_tier_stats(counts):
+    """Fold tier counts (from PageVisibility.close() or analyze_document) into the totals."""
+    with _tier_lock:
+        _tier_counts.update(counts)
+
+
+def get_tier_stats():
+    """Cumulative share of spans settled by each tier since process start."""
+    with _tier_lock:
+        counts = dict(_tier_counts)
+
+    spans = counts.get(TIER_GEOMETRY, 0) + counts.get(TIER_RASTER, 0)
+    pages = counts.get("pages", 0)
+
+    return {
+        "spans": spans,
+        "geometry_spans": counts.get(TIER_GEOMETRY, 0),
+        "raster_spans": counts.get(TIER_RASTER, 0),
+        "geometry_share": round(counts.get(TIER_GEOMETRY, 0) / spans, 4) if spans else 0.0,
+        "raster_share": round(counts.get(TIER_RASTER, 0) / spans, 4) if spans else 0.0,
+        "pages": pages,
+        # Pages with at least one get_pixmap call, and the calls themselves
+        "pages_rasterized": counts.get("pages_rasterized", 0),
+        "pages_skipped": pages - counts.get("pages_rasterized", 0),
+        "regions_rendered": counts.get("regions_rendered", 0),
+    }
@@ -1,28 +1,6 @@
-import os
-from openai import OpenAI
-from dotenv import load_dotenv
+from services.llm_gateway import INTERVIEWER_PROMPT, generate
 
-load_dotenv()
 
-client = OpenAI(
-    base_url="https://openrouter.ai/api/v1",
-    api_key=os.getenv("OPENROUTER_API_KEY") or os.getenv("OPENROUTER_API_KEY_B"),
-)
-
-MODEL = "openai/gpt-4o-mini"
-
-
-def generate_ai_response(prompt: str):
-    response = client.chat.completions.create(
-        model=MODEL,
-        messages=[
-            {
-                "role": "system",
-                "content": "You are a professional technical interviewer.",
-            },
-            {"role": "user", "content": prompt},
-        ],
-        temperature=0.7,
-    )
-
-    return response.choices[0].message.content
+async def generate_ai_response(prompt: str):
+    result = await generate(prompt, system_prompt=INTERVIEWER_PROMPT, max_tokens=None)
+    return result.text
@@ -0,0 +1,141 @@
+import os
+
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from pymongo import ReturnDocument
+
+from db import get_auth_collection
+from services.cache import LRUCache
+
+load_dotenv()
+
+FREEMIUM_LIMIT = int(os.getenv("FREEMIUM_LIMIT", "99"))
+USER_STATUS_CACHE_TTL = float(os.getenv("USER_STATUS_CACHE_TTL_SECONDS", "60"))
+
+FREE_LIMIT_DETAIL = "Free limit reached (3/3). Please upgrade to Premium for unlimited access."
+B2B_LICENCE_DETAIL = "Please buy the B2B Licence for Accessing this feature."
+
+STATUS_PROJECTION = {"_id": 0, "ispremium": 1, "b2blicence": 1, "freemium_count": 1}
+
+# email -> {"ispremium": ..., "b2blicence": ...}; short-lived so other workers
+# pick up licence changes quickly, and dropped here on admin updates.
+_user_status = LRUCache(max_entries=int(os.getenv("USER_STATUS_CACHE_SIZE", "10000")))
+
+
+def cache_user_status(email, doc):
+    status = {"ispremium": bool(doc.get("ispremium", False)), "b2blicence": doc.get("b2blicence", "no")}
+    _user_status.set(email, status, ttl=USER_STATUS_CACHE_TTL)
+    return status
+
+
+def invalidate_user_status(email):
+    _user_status.pop(email)
+
+
+def get_status_cache_stats():
+    return _user_status.stats()
+
+
+class QuotaReservation:
+    """One freemium unit taken for a request; refund() gives it back."""
+
+    def __init__(self, email, charged):
+        self.email = email
+        self.charged = charged
+        self.refunded = False
+
+    async def refund(self):
+        if not self.charged or self.refunded:
+            return
+        self.refunded = True
+        await get_auth_collection().update_one(
+            {"email": self.email, "freemium_count": {"$gt": 0}},
+            {"$inc": {"freemium_count": -1}},
+        )
+
+
+async def reserve_quota(email):
+    """
+    Take one freemium unit with a single conditional find_one_and_update.
+
+    Premium users known from the status cache skip the write entirely. The
+    slower paths (unknown user, premium user not yet cached, limit reached)
+    need one extra lookup to tell them apart.
+    """
+    status = _user_status.get(email)
+    if status and status["ispremium"]:
+        return QuotaReservation(email, charged=False)
+
+    auth_collection = get_auth_collection()
+    under_limit = {
+        "email": email,
+        "ispremium": {"$ne": True},
+        "$or": [
+            {"freemium_count": {"$lt": FREEMIUM_LIMIT}},
+            {"freemium_count": {"$exists": False}},
+        ],
+    }
+
+    doc = await auth_collection.find_one_and_update(
+        under_limit,
+        {"$inc": {"freemium_count": 1}},
+        projection=STATUS_PROJECTION,
+        return_document=ReturnDocument.BEFORE,  # only the unchanged status fields are read
+    )
+    if doc is not None:
+        cache_user_status(email, doc)
+        return QuotaReservation(email, charged=True)
+
+    doc = await auth_collection.find_one({"email": email}, STATUS_PROJECTION)
+
+    if doc is None:
+        # First request from this email: create the user, then charge once
+        await auth_collection.update_one(
+            {"email": email},
+            {"$setOnInsert": {"email": email, "freemium_count": 0, "ispremium": False, "b2blicence": "no"}},
+            upsert=True,
+        )
+        doc = await auth_collection.find_one_and_update(
+            under_limit,
+            {"$inc": {"freemium_count": 1}},
+            projection=STATUS_PROJECTION,
+            return_document=ReturnDocument.BEFORE,
+        )
+        if doc is None:
+            raise HTTPException(status_code=403, detail=FREE_LIMIT_DETAIL)
+        cache_user_status(email, doc)
+        return QuotaReservation(email, charged=True)
+
+    cache_user_status(email, doc)
+    if doc.get("ispremium", False):
+        return QuotaReservation(email, charged=False)
+
+    raise HTTPException(status_code=403, detail=FREE_LIMIT_DETAIL)
+
+
+async def require_quota(email: str):
+    """
+    FastAPI dependency: reserve a freemium unit before the handler runs and
+    refund it if the handler raises. Handlers that fail softly (e.g. return an
+    error body) call `await quota.refund()` themselves.
+    """
+    reservation = await reserve_quota(email)
+    try:
+        yield reservation
+    except Exception:
+        await reservation.refund()
+        raise
+
+
+async def require_b2b_licence(email: str):
+    """FastAPI dependency: reject users without a B2B licence."""
+    status = _user_status.get(email)
+    if status is None:
+        doc = await get_auth_collection().find_one({"email": email}, STATUS_PROJECTION)
+        if doc is None:
+            raise HTTPException(status_code=403, detail=B2B_LICENCE_DETAIL)
+        status = cache_user_status(email, doc)
+
+    if status["b2blicence"] == "no":
+        raise HTTPException(status_code=403, detail=B2B_LICENCE_DETAIL)
+    return email
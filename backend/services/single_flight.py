@@ -0,0 +1,84 @@
+import asyncio
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls that share a key into one execution.
+
+    The first caller for a key runs the work and every caller that arrives
+    while it is in flight waits for the same result (or exception). Nothing is
+    remembered once the call finishes; that is the response cache's job.
+    """
+
+    def __init__(self):
+        self._tasks = {}
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.collapsed = 0
+
+    async def do(self, key, fn):
+        """Await fn() once per key across concurrent coroutines."""
+        task = self._tasks.get(key)
+        if task is None:
+            # A separate task, so one caller disconnecting does not cancel the
+            # upstream call that the others are waiting on.
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda t: self._forget_task(key, t))
+            self.leaders += 1
+        else:
+            self.collapsed += 1
+
+        return await asyncio.shield(task)
+
+    def _forget_task(self, key, task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved even if every waiter went away
+
+    def do_sync(self, key, fn):
+        """Run fn() once per key across concurrent threads."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.collapsed += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        calls = self.leaders + self.collapsed
+        return {
+            "in_flight": len(self._tasks) + len(self._calls),
+            "upstream_calls": self.leaders,
+            "collapsed_calls": self.collapsed,
+            "collapse_rate": round(self.collapsed / calls, 4) if calls else 0.0,
+        }
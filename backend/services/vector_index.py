@@ -0,0 +1,393 @@
+import fcntl
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+from dotenv import load_dotenv
+
+from services.model_registry import DATA_DIR
+
+load_dotenv()
+
+VECTOR_INDEX_DIR = os.getenv("VECTOR_INDEX_DIR", os.path.join(DATA_DIR, "vectors"))
+# Clusters searched per query; more is slower but closer to exact
+VECTOR_NPROBE = int(os.getenv("VECTOR_NPROBE", "16"))
+# Below this many vectors a search is exact and no clustering is trained
+VECTOR_MIN_TRAIN = int(os.getenv("VECTOR_MIN_TRAIN", "4096"))
+# Retrain the clusters once the index has grown by this factor since the last training
+VECTOR_RETRAIN_GROWTH = float(os.getenv("VECTOR_RETRAIN_GROWTH", "2"))
+
+KMEANS_ITERATIONS = 15
+KMEANS_SAMPLE_PER_CLUSTER = 64
+
+
+def _normalize(rows):
+    rows = np.asarray(rows, dtype=np.float32)
+    return rows / np.clip(np.linalg.norm(rows, axis=-1, keepdims=True), 1e-12, None)
+
+
+def train_centroids(vectors, clusters, seed=0):
+    """Spherical k-means on a sample of unit vectors; returns unit centroids."""
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(vectors), clusters * KMEANS_SAMPLE_PER_CLUSTER)
+    sample = np.asarray(vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))])
+    centroids = sample[rng.choice(sample_size, clusters, replace=False)].copy()
+
+    for _ in range(KMEANS_ITERATIONS):
+        assignment = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, sample)
+        empty = np.bincount(assignment, minlength=clusters) == 0
+        # Re-seed empty clusters from random points so every list gets used
+        sums[empty] = sample[rng.choice(sample_size, int(empty.sum()), replace=False)]
+        centroids = _normalize(sums)
+    return centroids
+
+
+class VectorIndex:
+    """
+    Persistent, memory-mapped cosine index with IVF approximate search.
+
+    Files in the index directory:
+      vectors.f32   unit vectors appended row by row, read through np.memmap
+      log.jsonl     append-only add/delete records, replayed on load
+      texts.jsonl   the text of each added item, read back by byte offset
+      centroids.npy IVF cluster centres (absent until enough vectors exist)
+      index.lock    held while a process appends, so rows never interleave
+
+    Adds append a row and put it in its nearest cluster's list; deletes
+    write a tombstone that searches skip. Every worker process keeps its own
+    view of the shared files and catches up on the log before each add,
+    delete and search. Once the index reaches VECTOR_MIN_TRAIN vectors,
+    maybe_train() fits about sqrt(n) clusters, and a search scans only the
+    VECTOR_NPROBE clusters nearest the query. Smaller indexes are searched
+    exactly.
+    """
+
+    def __init__(self, directory, dim=None):
+        self.directory = directory
+        self.dim = dim
+        self._lock = threading.RLock()
+        self._train_lock = threading.Lock()
+        self._vectors = None  # memmap over vectors.f32
+        self._rows = 0
+        self._ids = []  # row -> item id
+        self._names = []
+        self._text_offsets = []
+        self._row_of = {}  # live item id -> row
+        self._deleted = np.zeros(0, dtype=bool)
+        self._centroids = None
+        self._lists = None  # cluster -> array of rows
+        self._trained_rows = 0
+        self._log_offset = 0  # bytes of log.jsonl already applied
+        self._meta_mtime = None
+
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            self.refresh()
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive across processes; every append happens inside it."""
+        with open(self._path("index.lock"), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _read_meta(self):
+        meta_path = self._path("meta.json")
+        try:
+            mtime = os.stat(meta_path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._meta_mtime:
+            return
+        self._meta_mtime = mtime
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        self.dim = meta["dim"]
+        if meta.get("trained_rows", 0) != self._trained_rows and os.path.exists(self._path("centroids.npy")):
+            # Another process (re)trained the clusters
+            self._trained_rows = meta["trained_rows"]
+            self._centroids = np.load(self._path("centroids.npy"))
+            self._lists = None
+
+    def refresh(self):
+        """Apply log records appended since the last read, by this or another process."""
+        with self._lock:
+            self._read_meta()
+            log_path = self._path("log.jsonl")
+            try:
+                size = os.path.getsize(log_path)
+            except FileNotFoundError:
+                size = 0
+            first_new_row = self._rows
+            if size > self._log_offset:
+                with open(log_path, "rb") as f:
+                    f.seek(self._log_offset)
+                    for raw in f:
+                        if not raw.endswith(b"\n"):
+                            break  # another process is mid-write; read it next time
+                        self._log_offset += len(raw)
+                        try:
+                            entry = json.loads(raw)
+                        except ValueError:
+                            print(f"Skipping unreadable line in {log_path}")
+                            continue
+                        if "delete" in entry:
+                            self._forget(entry["delete"])
+                        else:
+                            self._register(entry["add"], entry.get("name"), entry["offset"], entry["row"])
+
+            if self._centroids is not None and self._lists is None:
+                self._rebuild_lists()
+            elif self._centroids is not None and self._rows > first_new_row:
+                self._assign_rows(np.arange(first_new_row, self._rows))
+
+    def _register(self, item_id, name, offset, row):
+        previous = self._row_of.get(item_id)
+        if previous is not None and previous != row:
+            # A duplicate add in an older log; the latest row wins
+            self._deleted[previous] = True
+        while len(self._ids) <= row:
+            self._ids.append(None)
+            self._names.append(None)
+            self._text_offsets.append(None)
+        self._ids[row] = item_id
+        self._names[row] = name
+        self._text_offsets[row] = offset
+        self._row_of[item_id] = row
+        self._rows = max(self._rows, row + 1)
+        if row >= len(self._deleted):
+            # Grow by doubling; rows skipped after a crash mid-add stay dead
+            grown = np.ones(max(row + 1, 2 * len(self._deleted)), dtype=bool)
+            grown[:len(self._deleted)] = self._deleted
+            self._deleted = grown
+        self._deleted[row] = False
+
+    def _forget(self, item_id):
+        row = self._row_of.pop(item_id, None)
+        if row is not None:
+            self._deleted[row] = True
+        return row is not None
+
+    def _remap(self):
+        path = self._path("vectors.f32")
+        if self.dim is None or not os.path.exists(path):
+            self._vectors = None
+            return
+        rows = os.path.getsize(path) // (self.dim * 4)
+        self._vectors = np.memmap(path, dtype=np.float32, mode="r", shape=(rows, self.dim)) if rows else None
+
+    def _write_meta(self):
+        with open(self._path("meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"dim": self.dim, "trained_rows": self._trained_rows}, f)
+        self._meta_mtime = os.stat(self._path("meta.json")).st_mtime_ns
+
+    def __len__(self):
+        return len(self._row_of)
+
+    def __contains__(self, item_id):
+        return item_id in self._row_of
+
+    def add(self, item_id, vector, name=None, text=""):
+        """Add one item; returns False if item_id is already live in the index."""
+        vector = _normalize(vector).reshape(-1)
+        with self._lock, self._file_lock():
+            self.refresh()
+            if item_id in self._row_of:
+                return False
+            if self.dim is None:
+                self.dim = len(vector)
+                self._write_meta()
+            if len(vector) != self.dim:
+                raise ValueError(f"Vector has {len(vector)} dimensions, index expects {self.dim}")
+
+            with open(self._path("texts.jsonl"), "ab") as f:
+                offset = f.tell()
+                f.write(json.dumps(text).encode("utf-8") + b"\n")
+            with open(self._path("vectors.f32"), "ab") as f:
+                row_bytes = self.dim * 4
+                if f.tell() % row_bytes:
+                    # Drop half a row left by a crash mid-add so rows stay aligned
+                    f.truncate(f.tell() - f.tell() % row_bytes)
+                    f.seek(0, os.SEEK_END)
+                row = f.tell() // row_bytes
+                f.write(vector.tobytes())
+            with open(self._path("log.jsonl"), "ab") as f:
+                f.write(json.dumps({"add": item_id, "name": name, "offset": offset, "row": row}).encode("utf-8") + b"\n")
+                self._log_offset = f.tell()
+
+            self._register(item_id, name, offset, row)
+            if self._centroids is not None:
+                cluster = int(np.argmax(self._centroids @ vector))
+                self._lists[cluster] = np.append(self._lists[cluster], row)
+            return True
+
+    def delete(self, item_id):
+        """Tombstone an item; returns False if it is not in the index."""
+        with self._lock, self._file_lock():
+            self.refresh()
+            if item_id not in self._row_of:
+                return False
+            with open(self._path("log.jsonl"), "ab") as f:
+                f.write(json.dumps({"delete": item_id}).encode("utf-8") + b"\n")
+                self._log_offset = f.tell()
+            return self._forget(item_id)
+
+    def get_text(self, item_id):
+        with self._lock:
+            offset = self._text_offsets[self._row_of[item_id]]
+        with open(self._path("texts.jsonl"), "rb") as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    def _matrix(self):
+        if self._vectors is None or len(self._vectors) < self._rows:
+            self._remap()
+        return self._vectors
+
+    @staticmethod
+    def _assignment(vectors, centroids, rows):
+        assignment = np.empty(len(rows), dtype=np.int64)
+        for start in range(0, len(rows), 65536):
+            block = np.asarray(vectors[rows[start:start + 65536]])
+            assignment[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+        return assignment
+
+    @staticmethod
+    def _group(rows, assignment, clusters):
+        order = np.argsort(assignment, kind="stable")
+        bounds = np.searchsorted(assignment[order], np.arange(clusters + 1))
+        return [rows[order[bounds[c]:bounds[c + 1]]] for c in range(clusters)]
+
+    def _rebuild_lists(self):
+        rows = np.arange(self._rows)
+        assignment = self._assignment(self._matrix(), self._centroids, rows)
+        self._lists = self._group(rows, assignment, len(self._centroids))
+
+    def _assign_rows(self, rows):
+        assignment = self._assignment(self._matrix(), self._centroids, rows)
+        for cluster, new_rows in enumerate(self._group(rows, assignment, len(self._centroids))):
+            if new_rows.size:
+                self._lists[cluster] = np.concatenate([self._lists[cluster], new_rows])
+
+    def train(self):
+        """
+        (Re)train the IVF clusters over every stored vector and persist them.
+        The k-means runs on a snapshot without holding the index lock, so
+        searches and adds carry on meanwhile.
+        """
+        with self._train_lock:
+            with self._lock:
+                self.refresh()
+                rows = self._rows
+                vectors = self._matrix()
+            if not rows:
+                return
+
+            centroids = train_centroids(vectors[:rows], max(1, int(np.sqrt(rows))))
+            snapshot = np.arange(rows)
+            lists = self._group(snapshot, self._assignment(vectors, centroids, snapshot), len(centroids))
+
+            with self._lock, self._file_lock():
+                tmp_path = self._path(f"centroids.{os.getpid()}.tmp")
+                with open(tmp_path, "wb") as f:
+                    np.save(f, centroids)
+                os.replace(tmp_path, self._path("centroids.npy"))
+                self._centroids, self._lists, self._trained_rows = centroids, lists, rows
+                self._write_meta()
+                if self._rows > rows:
+                    # Rows added while training
+                    self._assign_rows(np.arange(rows, self._rows))
+
+    def needs_training(self):
+        with self._lock:
+            self.refresh()
+            if self._rows < VECTOR_MIN_TRAIN:
+                return False
+            return self._centroids is None or self._rows >= self._trained_rows * VECTOR_RETRAIN_GROWTH
+
+    def maybe_train(self):
+        """Train once the index is big enough, or has grown enough since the last training."""
+        if self.needs_training():
+            self.train()
+
+    def search(self, vector, top_k=10, nprobe=None, exact=False):
+        """[(item_id, name, score)] of the top_k live items by cosine similarity, best first."""
+        query = _normalize(vector).reshape(-1)
+        with self._lock:
+            self.refresh()
+            if not self._row_of:
+                return []
+            vectors = self._matrix()
+
+            if exact or self._centroids is None:
+                # A full scan reads the store sequentially instead of gathering rows
+                rows = np.flatnonzero(~self._deleted[:self._rows])
+                scores = (vectors[:self._rows] @ query)[rows]
+            else:
+                nprobe = min(nprobe or VECTOR_NPROBE, len(self._centroids))
+                nearest = np.argpartition(-(self._centroids @ query), nprobe - 1)[:nprobe]
+                rows = np.sort(np.concatenate([self._lists[c] for c in nearest]))
+                rows = rows[~self._deleted[rows]]
+                scores = np.asarray(vectors[rows]) @ query
+            if rows.size == 0:
+                return []
+
+            top_k = min(top_k, rows.size)
+            top = np.argpartition(-scores, top_k - 1)[:top_k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [(self._ids[rows[i]], self._names[rows[i]], float(scores[i])) for i in top]
+
+    def stats(self):
+        with self._lock:
+            self.refresh()
+            return {
+                "live": len(self._row_of),
+                "rows": self._rows,
+                "deleted": int(self._deleted[:self._rows].sum()),
+                "dim": self.dim,
+                "clusters": 0 if self._centroids is None else len(self._centroids),
+                "trained_rows": self._trained_rows,
+            }
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+_loading_locks = {}  # tenant -> lock held while that tenant's index loads
+
+
+def tenant_directory(tenant):
+    return os.path.join(VECTOR_INDEX_DIR, hashlib.sha256(tenant.encode("utf-8")).hexdigest()[:32])
+
+
+def get_tenant_vector_index(tenant):
+    """
+    The tenant's vector index, loaded from disk on first use. Loading replays
+    the log and may assign every row to a cluster, so it holds only that
+    tenant's lock.
+    """
+    with _indexes_lock:
+        index = _indexes.get(tenant)
+        if index is not None:
+            return index
+        loading_lock = _loading_locks.setdefault(tenant, threading.Lock())
+
+    with loading_lock:
+        with _indexes_lock:
+            index = _indexes.get(tenant)
+        if index is None:
+            index = VectorIndex(tenant_directory(tenant))
+            with _indexes_lock:
+                _indexes[tenant] = index
+                _loading_locks.pop(tenant, None)
+        return index